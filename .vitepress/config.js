@@ -1,6 +1,9 @@
 import { defineConfig } from 'vitepress'
 import { generateSidebar } from 'vitepress-sidebar'
 
+// 源目录，可通过 DOCS_SRC_DIR 指向 fingerprint_assets.py 生成的指纹化副本
+const docsDir = process.env.DOCS_SRC_DIR || 'docs'
+
 // 自动化侧边栏路径修复函数
 function generateSidebarWithCorrectPaths(routePrefix, scanStartPath, options = {}) {
   // 生成原始侧边栏
@@ -43,8 +46,8 @@ export default defineConfig({
   title: '古诗词智能文档',
   description: '利用智能技术处理古诗词文档的知识库，包含古诗词赏析、创作指导和智能化处理工具',
   
-  // 设置源目录为docs
-  srcDir: 'docs',
+  // 设置源目录为docs（或指纹化后的副本）
+  srcDir: docsDir,
   
   // 忽略死链接检查
   ignoreDeadLinks: true,
@@ -87,7 +90,7 @@ export default defineConfig({
     // 侧边栏 - 使用自动化路径修复的 vitepress-sidebar
     sidebar: {
       // 山水田园目录自动生成侧边栏
-      '/landscape/': generateSidebarWithCorrectPaths('/landscape/', 'docs/landscape', {
+      '/landscape/': generateSidebarWithCorrectPaths('/landscape/', `${docsDir}/landscape`, {
         hyphenToSpace: true,
         underscoreToSpace: true,
         capitalizeFirst: true,
@@ -100,7 +103,7 @@ export default defineConfig({
       }),
       
       // 边塞征战目录自动生成侧边栏
-      '/frontier/': generateSidebarWithCorrectPaths('/frontier/', 'docs/frontier', {
+      '/frontier/': generateSidebarWithCorrectPaths('/frontier/', `${docsDir}/frontier`, {
         hyphenToSpace: true,
         underscoreToSpace: true,
         capitalizeFirst: true,
@@ -113,7 +116,7 @@ export default defineConfig({
       }),
       
       // 咏史怀古目录自动生成侧边栏
-      '/history/': generateSidebarWithCorrectPaths('/history/', 'docs/history', {
+      '/history/': generateSidebarWithCorrectPaths('/history/', `${docsDir}/history`, {
         hyphenToSpace: true,
         underscoreToSpace: true,
         capitalizeFirst: true,
@@ -126,7 +129,7 @@ export default defineConfig({
       }),
       
       // 抒情咏物目录自动生成侧边栏
-      '/lyrical/': generateSidebarWithCorrectPaths('/lyrical/', 'docs/lyrical', {
+      '/lyrical/': generateSidebarWithCorrectPaths('/lyrical/', `${docsDir}/lyrical`, {
         hyphenToSpace: true,
         underscoreToSpace: true,
         capitalizeFirst: true,
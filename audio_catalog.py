@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+音频目录与播放器嵌入优化
+纯Python解析 docs/*/data/mp3 下每个mp3的帧头（不解码音频），得到时长、码率和大小，
+结果按内容哈希缓存；并将页面中的 <audio> 改为 preload="none"，在下载链接后标注时长，
+超出大小或码率预算的文件单独列出
+
+用法: python audio_catalog.py                 # 改写页面并检查预算
+      python audio_catalog.py --dry-run       # 只报告需要改写的页面
+      python audio_catalog.py --max-size-mb 1 --max-bitrate 128
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from deploy_backup import file_sha256, atomic_write, format_size
+from ignore_rules import get_matcher
+from link_refs import resolve_link
+
+CACHE_VERSION = 1
+DEFAULT_CACHE = '.cache/audio_catalog.json'
+DEFAULT_MAX_SIZE_MB = 2.0
+DEFAULT_MAX_BITRATE = 128
+
+# 码率表（kbps），按 (MPEG-1?, 层) 索引，下标为帧头中的码率序号
+BITRATES = {
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+# 采样率表，按帧头中的版本位（3=MPEG-1, 2=MPEG-2, 0=MPEG-2.5）索引
+SAMPLE_RATES = {3: [44100, 48000, 32000], 2: [22050, 24000, 16000], 0: [11025, 12000, 8000]}
+
+AUDIO_TAG_PATTERN = re.compile(r'<audio\b([^>]*)>')
+PRELOAD_PATTERN = re.compile(r'''\spreload\s*=\s*(?:"[^"]*"|'[^']*'|\S+)''')
+SOURCE_PATTERN = re.compile(r'''<source\b[^>]*?\ssrc=["']([^"']+\.mp3)["']''', re.IGNORECASE)
+AUDIO_BLOCK_PATTERN = re.compile(r'<audio\b[^>]*>.*?</audio>', re.DOTALL)
+# 指向mp3的Markdown链接及其后已有的时长标注
+MP3_LINK_PATTERN = re.compile(r'(\[[^\]]*\]\(([^)\s]+\.mp3)\))(（时长[^）]*）)?')
+# 没有下载链接时在 </audio> 下一行标注
+BLOCK_NOTE_PATTERN = re.compile(r'\n（时长[^）]*）')
+
+
+def parse_frame_header(data: bytes, offset: int) -> Optional[Dict]:
+    """解析offset处的4字节MPEG音频帧头，无效时返回None"""
+    if offset + 4 > len(data) or data[offset] != 0xFF or data[offset + 1] & 0xE0 != 0xE0:
+        return None
+    b1, b2, b3 = data[offset + 1], data[offset + 2], data[offset + 3]
+    version = (b1 >> 3) & 0x03
+    layer = 4 - ((b1 >> 1) & 0x03)
+    bitrate_index = b2 >> 4
+    sample_rate_index = (b2 >> 2) & 0x03
+    if version == 1 or layer == 4 or bitrate_index in (0, 15) or sample_rate_index == 3:
+        return None
+
+    mpeg1 = version == 3
+    bitrate = BITRATES[(mpeg1, layer)][bitrate_index]
+    sample_rate = SAMPLE_RATES[version][sample_rate_index]
+    padding = (b2 >> 1) & 0x01
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate * 1000 // sample_rate + padding) * 4
+    else:
+        samples = 1152 if mpeg1 or layer == 2 else 576
+        length = samples // 8 * bitrate * 1000 // sample_rate + padding
+    return {
+        'mpeg1': mpeg1,
+        'layer': layer,
+        'bitrate': bitrate,
+        'sample_rate': sample_rate,
+        'samples': samples,
+        'length': length,
+        'mono': (b3 >> 6) == 3,
+    }
+
+
+def skip_id3v2(data: bytes) -> int:
+    """跳过文件开头的ID3v2标签（可能有多个），返回音频数据起始偏移"""
+    offset = 0
+    while data[offset:offset + 3] == b'ID3' and offset + 10 <= len(data):
+        flags = data[offset + 5]
+        size = 0
+        for byte in data[offset + 6:offset + 10]:
+            size = (size << 7) | (byte & 0x7F)
+        offset += 10 + size + (10 if flags & 0x10 else 0)
+    return offset
+
+
+def find_first_frame(data: bytes, offset: int) -> Tuple[int, Optional[Dict]]:
+    """从offset开始查找第一个有效帧（要求下一帧头也有效，避免误判）"""
+    while True:
+        offset = data.find(b'\xff', offset)
+        if offset < 0:
+            return -1, None
+        header = parse_frame_header(data, offset)
+        if header:
+            following = offset + header['length']
+            if following >= len(data) or parse_frame_header(data, following):
+                return offset, header
+        offset += 1
+
+
+def read_vbr_header(data: bytes, offset: int, header: Dict) -> Tuple[Optional[int], bool]:
+    """读取首帧中的Xing/Info或VBRI头，返回(总帧数, 是否为VBR)"""
+    if header['mpeg1']:
+        side_info = 17 if header['mono'] else 32
+    else:
+        side_info = 9 if header['mono'] else 17
+    xing = offset + 4 + side_info
+    tag = data[xing:xing + 4]
+    if tag in (b'Xing', b'Info'):
+        flags = int.from_bytes(data[xing + 4:xing + 8], 'big')
+        if flags & 0x01:
+            # Info 是CBR编码器写入的同格式头
+            return int.from_bytes(data[xing + 8:xing + 12], 'big'), tag == b'Xing'
+    vbri = offset + 4 + 32
+    if data[vbri:vbri + 4] == b'VBRI':
+        return int.from_bytes(data[vbri + 14:vbri + 18], 'big'), True
+    return None, False
+
+
+def parse_mp3(path: Path) -> Dict:
+    """解析mp3帧头，返回时长（秒）、平均码率（kbps）、大小等信息"""
+    data = path.read_bytes()
+    size = len(data)
+    end = size - 128 if data[-128:-125] == b'TAG' else size
+
+    offset, header = find_first_frame(data, skip_id3v2(data))
+    if header is None:
+        raise ValueError("未找到有效的MPEG音频帧")
+
+    frame_count, vbr = read_vbr_header(data, offset, header)
+    if frame_count:
+        # Xing/Info头中记录了总帧数，首帧本身不含音频
+        duration = frame_count * header['samples'] / header['sample_rate']
+        audio_bytes = end - offset - header['length']
+    else:
+        # 没有VBR头时逐帧累加，只读帧头不解码
+        frame_count = 0
+        duration = 0.0
+        bitrates = set()
+        position = offset
+        while position < end:
+            frame = parse_frame_header(data, position)
+            if frame is None or position + frame['length'] > end:
+                break
+            frame_count += 1
+            duration += frame['samples'] / frame['sample_rate']
+            bitrates.add(frame['bitrate'])
+            position += frame['length']
+        audio_bytes = position - offset
+        vbr = len(bitrates) > 1
+
+    return {
+        'size': size,
+        'sample_rate': header['sample_rate'],
+        'frames': frame_count,
+        'vbr': vbr,
+        'duration': round(duration, 3),
+        'bitrate': round(audio_bytes * 8 / duration / 1000) if duration else header['bitrate'],
+    }
+
+
+def format_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    if seconds >= 3600:
+        return f"{seconds // 3600}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 60}:{seconds % 60:02d}"
+
+
+def audio_note(info: Dict) -> str:
+    return f"（时长 {format_duration(info['duration'])}，{format_size(info['size'])}）"
+
+
+def load_cache(cache_file: Optional[Path]) -> Dict:
+    if cache_file is None:
+        return {'version': CACHE_VERSION, 'files': {}, 'audio': {}}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            cache = json.load(f)
+        if cache.get('version') == CACHE_VERSION:
+            return cache
+    except (OSError, ValueError):
+        pass
+    return {'version': CACHE_VERSION, 'files': {}, 'audio': {}}
+
+
+def build_catalog(docs_dir: Path, project_root: Path,
+                  cache_file: Optional[Path]) -> Tuple[Dict[Path, Dict], int, List[Tuple[Path, str]]]:
+    """解析 docs/*/data/mp3 下的所有mp3，返回({路径: 信息}, 实际解析的文件数, [(无法解析的文件, 原因), ...])
+
+    单个文件损坏或被截断时记录原因并继续，不中断整个目录的解析
+    """
+    cache = load_cache(cache_file)
+    catalog = {}
+    parsed = 0
+    errors = []
+    files = {}
+    for root, dirs, names in get_matcher(project_root).walk(docs_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        if Path(root).name != 'mp3' or Path(root).parent.name != 'data':
+            continue
+        for name in sorted(names):
+            if not name.lower().endswith('.mp3'):
+                continue
+            path = Path(os.path.abspath(Path(root) / name))
+            rel_path = path.relative_to(Path(os.path.abspath(project_root))).as_posix()
+            try:
+                st = path.stat()
+                # 大小和修改时间未变时沿用上次的哈希
+                entry = cache['files'].get(rel_path)
+                if not entry or entry['size'] != st.st_size or entry['mtime_ns'] != st.st_mtime_ns:
+                    entry = {'size': st.st_size, 'mtime_ns': st.st_mtime_ns, 'sha256': file_sha256(path)}
+                info = cache['audio'].get(entry['sha256'])
+                if info is None:
+                    info = parse_mp3(path)
+                    cache['audio'][entry['sha256']] = info
+                    parsed += 1
+            except (OSError, ValueError) as e:
+                # 解析失败的文件不写入缓存，修复后下次会重新解析
+                errors.append((path, e.strerror if isinstance(e, OSError) and e.strerror else str(e)))
+                continue
+            files[rel_path] = entry
+            catalog[path] = info
+
+    if cache_file:
+        used = {entry['sha256'] for entry in files.values()}
+        cache['files'] = files
+        cache['audio'] = {digest: info for digest, info in cache['audio'].items() if digest in used}
+        atomic_write(cache_file, json.dumps(cache, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+    return catalog, parsed, errors
+
+
+def rewrite_page(content: str, source_dir: Path, docs_dir: Path, catalog: Dict[Path, Dict]) -> str:
+    """<audio>加上preload="none"，在下载链接后（或播放器下一行）标注时长和大小，可重复执行"""
+    def audio_tag(match):
+        attributes = PRELOAD_PATTERN.sub('', match.group(1))
+        return f'<audio{attributes} preload="none">'
+
+    content = AUDIO_TAG_PATTERN.sub(audio_tag, content)
+
+    annotated = set()
+
+    def mp3_link(match):
+        target = resolve_link(match.group(2), source_dir, docs_dir)
+        info = catalog.get(target)
+        if info is None:
+            return match.group(0)
+        annotated.add(target)
+        return match.group(1) + audio_note(info)
+
+    content = MP3_LINK_PATTERN.sub(mp3_link, content)
+
+    # 没有下载链接的播放器在 </audio> 下一行标注，已有的旧标注整体替换
+    parts = []
+    position = 0
+    for match in AUDIO_BLOCK_PATTERN.finditer(content):
+        sources = [resolve_link(src, source_dir, docs_dir) for src in SOURCE_PATTERN.findall(match.group(0))]
+        info = next((catalog[source] for source in sources if source in catalog), None)
+        note = BLOCK_NOTE_PATTERN.match(content, match.end())
+        parts.append(content[position:match.end()])
+        position = match.end()
+        if info is None or any(source in annotated for source in sources):
+            continue
+        parts.append('\n' + audio_note(info))
+        if note:
+            position = note.end()
+    parts.append(content[position:])
+    return ''.join(parts)
+
+
+def check_budget(catalog: Dict[Path, Dict], max_size_mb: float, max_bitrate: int) -> List[Tuple[Path, List[str]]]:
+    """返回超出预算的文件及原因"""
+    flagged = []
+    for path, info in sorted(catalog.items()):
+        reasons = []
+        if info['size'] > max_size_mb * 1024 * 1024:
+            reasons.append(f"大小 {format_size(info['size'])} 超过 {max_size_mb:g} MB")
+        if info['bitrate'] > max_bitrate:
+            reasons.append(f"码率 {info['bitrate']} kbps 超过 {max_bitrate} kbps")
+        if reasons:
+            flagged.append((path, reasons))
+    return flagged
+
+
+def main():
+    parser = argparse.ArgumentParser(description='音频目录与播放器嵌入优化')
+    parser.add_argument('--docs', default='docs', help='文档目录 (默认: docs)')
+    parser.add_argument('--cache', default=DEFAULT_CACHE, help=f'解析结果缓存文件 (默认: {DEFAULT_CACHE})')
+    parser.add_argument('--no-cache', action='store_true', help='不读写缓存')
+    parser.add_argument('--dry-run', action='store_true', help='只报告需要改写的页面，不修改文件')
+    parser.add_argument('--max-size-mb', type=float, default=float(os.getenv('AUDIO_MAX_SIZE_MB', DEFAULT_MAX_SIZE_MB)),
+                        help=f'单个音频文件大小预算 (默认: 环境变量AUDIO_MAX_SIZE_MB或{DEFAULT_MAX_SIZE_MB:g})')
+    parser.add_argument('--max-bitrate', type=int, default=int(os.getenv('AUDIO_MAX_BITRATE', DEFAULT_MAX_BITRATE)),
+                        help=f'平均码率预算，kbps (默认: 环境变量AUDIO_MAX_BITRATE或{DEFAULT_MAX_BITRATE})')
+    parser.add_argument('--list', action='store_true', help='列出所有音频的时长、码率和大小')
+
+    args = parser.parse_args()
+
+    docs_dir = Path(os.path.abspath(args.docs))
+    if not docs_dir.is_dir():
+        print(f"错误: 文档目录不存在 {args.docs}")
+        return 1
+
+    project_root = Path.cwd()
+    start = time.perf_counter()
+    catalog, parsed, errors = build_catalog(docs_dir, project_root, None if args.no_cache else Path(args.cache))
+
+    from link_batch import find_markdown_files, display_path
+    from rewrite_engine import RewriteSession
+    pages_changed = []
+    # 页面统一经 RewriteSession 原子替换，保留原文件权限
+    with RewriteSession(project_root, dry_run=args.dry_run) as session:
+        for md_file in find_markdown_files(docs_dir, project_root):
+            md_file = Path(os.path.abspath(md_file))
+            content = session.read(md_file)
+            if '<audio' not in content and '.mp3' not in content:
+                continue
+            new_content = rewrite_page(content, md_file.parent, docs_dir, catalog)
+            if new_content != content:
+                pages_changed.append(md_file)
+                session.stage(md_file, content, new_content)
+    elapsed = time.perf_counter() - start
+
+    total_size = sum(info['size'] for info in catalog.values())
+    total_duration = sum(info['duration'] for info in catalog.values())
+    print(f"=== 音频目录 ===")
+    print(f"音频文件数: {len(catalog)} (本次解析 {parsed}，其余来自缓存，无法解析 {len(errors)})")
+    print(f"总时长: {format_duration(total_duration)}")
+    print(f"总大小: {format_size(total_size)}")
+    if args.dry_run:
+        print(f"需要改写的页面: {len(pages_changed)}")
+    else:
+        print(f"已改写的页面: {len(session.updated)}")
+        if session.skipped:
+            print(f"跳过的页面: {len(session.skipped)} (读取后被其他进程修改)")
+    print(f"耗时: {elapsed:.2f} 秒")
+
+    root = Path(os.path.abspath(project_root))
+    if args.list:
+        print(f"\n{'时长':>8} {'码率':>9} {'大小':>10}  文件")
+        for path, info in sorted(catalog.items()):
+            print(f"{format_duration(info['duration']):>8} {info['bitrate']:>5} kbps {format_size(info['size']):>10}  "
+                  f"{display_path(path, root)}")
+
+    if args.dry_run:
+        for md_file in pages_changed:
+            print(f"  将改写: {display_path(md_file, root)}")
+    else:
+        for md_file in session.updated:
+            print(f"  改写: {display_path(md_file, root)}")
+        for md_file in session.skipped:
+            print(f"  跳过: {display_path(md_file, root)}")
+
+    if errors:
+        print(f"\n无法解析的音频文件:")
+        for path, reason in sorted(errors):
+            print(f"  {display_path(path, root)}: {reason}")
+
+    flagged = check_budget(catalog, args.max_size_mb, args.max_bitrate)
+    if flagged:
+        print(f"\n超出预算的音频文件:")
+        for path, reasons in flagged:
+            print(f"  {display_path(path, root)}: {'，'.join(reasons)}")
+    if errors or flagged:
+        return 1
+
+    print(f"\n✅ 所有音频文件都在预算内 (≤ {args.max_size_mb:g} MB，≤ {args.max_bitrate} kbps)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
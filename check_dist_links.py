@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+构建产物链接检查工具
+扫描 VitePress 构建输出（.vitepress/dist）中的所有HTML文件，
+校验每个站内 href/src 是否指向真实存在的页面路由或静态资源
+"""
+
+import os
+import re
+import sys
+import html
+import time
+import argparse
+import posixpath
+from pathlib import Path
+from urllib.parse import unquote
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Set, Tuple
+
+# 默认的构建输出目录（按顺序查找）
+DEFAULT_DIST_DIRS = ['docs/.vitepress/dist', '.vitepress/dist']
+
+# 直接在字节上匹配属性值，避免解析整个DOM
+ATTRIBUTE_PATTERN = re.compile(rb'''\s(?:href|src)\s*=\s*(?:"([^"]*)"|'([^']*)')''', re.IGNORECASE)
+SCHEME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+_known_routes: Set[str] = set()
+
+
+def find_dist_dir(project_root: Path = Path('.')) -> Path:
+    """查找默认的构建输出目录"""
+    for candidate in DEFAULT_DIST_DIRS:
+        if (project_root / candidate).is_dir():
+            return project_root / candidate
+    return project_root / DEFAULT_DIST_DIRS[0]
+
+
+def list_dist_files(dist_dir: Path) -> List[str]:
+    """列出构建目录下的所有文件（相对路径，posix格式）"""
+    files = []
+    for root, dirs, names in os.walk(dist_dir):
+        rel_root = os.path.relpath(root, dist_dir).replace(os.sep, '/')
+        prefix = '' if rel_root == '.' else rel_root + '/'
+        files.extend(prefix + name for name in names)
+    return files
+
+
+def build_routes(files: Iterable[str], base: str = '/', clean_urls: bool = True) -> Set[str]:
+    """根据构建产物生成所有可访问的路由和资源路径"""
+    routes = set()
+    for rel_path in files:
+        url = base + rel_path
+        routes.add(url)
+        if not rel_path.endswith('.html'):
+            continue
+        stem = url[:-len('.html')]
+        if clean_urls:
+            routes.add(stem)
+        if posixpath.basename(rel_path) == 'index.html':
+            directory = stem[:-len('index')]
+            routes.add(directory)
+            if directory != base:
+                routes.add(directory.rstrip('/'))
+    return routes
+
+
+def page_url(rel_path: str, base: str = '/') -> str:
+    """HTML文件对应的页面URL所在目录，用于解析相对链接"""
+    return base + posixpath.dirname(rel_path) + '/' if posixpath.dirname(rel_path) else base
+
+
+def extract_links(content: bytes) -> List[str]:
+    """提取HTML中所有href/src属性值"""
+    links = []
+    for match in ATTRIBUTE_PATTERN.finditer(content):
+        value = match.group(1) if match.group(1) is not None else match.group(2)
+        links.append(value.decode('utf-8', 'replace'))
+    return links
+
+
+def normalize_link(link: str, page_dir: str) -> str:
+    """将站内链接解析为绝对路径，外部链接和纯锚点返回空字符串"""
+    if '&' in link:
+        link = html.unescape(link)
+    link = link.strip()
+    if not link or link.startswith('#') or link.startswith('//') or SCHEME_PATTERN.match(link):
+        return ''
+    link = link.split('#', 1)[0].split('?', 1)[0]
+    if not link:
+        return ''
+    link = unquote(link)
+    if not link.startswith('/'):
+        link = page_dir + link
+    trailing = link.endswith('/')
+    link = posixpath.normpath(link)
+    if trailing and link != '/':
+        link += '/'
+    return link
+
+
+def _init_worker(routes: Set[str]):
+    global _known_routes
+    _known_routes = routes
+
+
+def check_pages(args: Tuple[str, List[str], str]) -> Tuple[int, int, List[Tuple[str, str, str]]]:
+    """检查一批页面，返回(页面数, 链接数, [(页面, 原始链接, 解析后路径), ...])"""
+    dist_dir, rel_paths, base = args
+    link_count = 0
+    broken = []
+    for rel_path in rel_paths:
+        with open(os.path.join(dist_dir, rel_path), 'rb') as f:
+            content = f.read()
+        page_dir = page_url(rel_path, base)
+        for link in extract_links(content):
+            target = normalize_link(link, page_dir)
+            if not target:
+                continue
+            link_count += 1
+            if target not in _known_routes:
+                broken.append((rel_path, link, target))
+    return len(rel_paths), link_count, broken
+
+
+def check_dist(dist_dir: Path, base: str = '/', clean_urls: bool = True,
+               workers: int = None) -> Tuple[int, int, Dict[str, List[Tuple[str, str]]]]:
+    """检查整个构建目录，返回(页面数, 站内链接数, {目标路径: [(页面, 原始链接), ...]})"""
+    files = list_dist_files(dist_dir)
+    routes = build_routes(files, base, clean_urls)
+    pages = [f for f in files if f.endswith('.html')]
+
+    workers = workers or os.cpu_count() or 1
+    chunk_size = max(1, min(500, len(pages) // (workers * 4) or 1))
+    chunks = [(str(dist_dir), pages[i:i + chunk_size], base) for i in range(0, len(pages), chunk_size)]
+
+    if workers == 1 or len(chunks) <= 1:
+        _init_worker(routes)
+        results = map(check_pages, chunks)
+        return _collect(results)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(routes,)) as executor:
+        return _collect(executor.map(check_pages, chunks))
+
+
+def _collect(results) -> Tuple[int, int, Dict[str, List[Tuple[str, str]]]]:
+    total_pages = 0
+    total_links = 0
+    broken = defaultdict(list)
+    for page_count, link_count, page_broken in results:
+        total_pages += page_count
+        total_links += link_count
+        for rel_path, link, target in page_broken:
+            broken[target].append((rel_path, link))
+    return total_pages, total_links, broken
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检查VitePress构建产物中的站内链接')
+    parser.add_argument('--dist', help=f"构建输出目录 (默认: {' 或 '.join(DEFAULT_DIST_DIRS)})")
+    parser.add_argument('--base', default='/', help='站点base路径 (默认: /)')
+    parser.add_argument('--no-clean-urls', action='store_true', help='站点未启用cleanUrls时使用')
+    parser.add_argument('--workers', type=int, help='并行进程数 (默认: CPU核数)')
+    parser.add_argument('--max-report', type=int, default=50, help='最多列出的损坏目标数 (默认: 50)')
+
+    args = parser.parse_args()
+
+    dist_dir = Path(args.dist) if args.dist else find_dist_dir()
+    if not dist_dir.is_dir():
+        print(f"错误: 构建目录不存在 {dist_dir}")
+        print("请先运行 'npm run docs:build'")
+        return 1
+
+    base = '/' + args.base.strip('/') + '/' if args.base.strip('/') else '/'
+
+    print(f"扫描构建目录: {dist_dir}")
+    start = time.perf_counter()
+    total_pages, total_links, broken = check_dist(dist_dir, base, not args.no_clean_urls, args.workers)
+    elapsed = time.perf_counter() - start
+
+    broken_count = sum(len(refs) for refs in broken.values())
+
+    print(f"\n=== 构建产物链接检查 ===")
+    print(f"HTML页面数: {total_pages}")
+    print(f"站内链接数: {total_links}")
+    print(f"损坏链接数: {broken_count}")
+    print(f"损坏目标数: {len(broken)}")
+    print(f"耗时: {elapsed:.2f} 秒")
+
+    if broken:
+        print(f"\n损坏的链接目标:")
+        ordered = sorted(broken.items(), key=lambda item: (-len(item[1]), item[0]))
+        for target, refs in ordered[:args.max_report]:
+            print(f"  {target} ({len(refs)} 处引用)")
+            for rel_path, link in refs[:3]:
+                print(f"    {rel_path}: {link}")
+        if len(broken) > args.max_report:
+            print(f"  ... 另有 {len(broken) - args.max_report} 个目标未列出")
+    else:
+        print("\n✅ 所有站内链接都正常!")
+
+    return 0 if not broken else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -51,8 +51,71 @@ def validate_environment():
     
     return True
 
+def project_directory() -> Path:
+    """项目目录（同时加入导入路径，供加载项目内的工具模块）"""
+    project_dir = Path(__file__).resolve().parent
+    if str(project_dir) not in sys.path:
+        sys.path.insert(0, str(project_dir))
+    return project_dir
+
+def resolve_dist_dir() -> Path:
+    """本次部署的构建产物目录: 优先 LOCAL_DIST_PATH，未设置或不存在时自动查找"""
+    project_dir = project_directory()
+    from check_dist_links import find_dist_dir
+    
+    dist_dir = Path(os.getenv('LOCAL_DIST_PATH', ''))
+    if not dist_dir.is_absolute():
+        dist_dir = project_dir / dist_dir
+    if not os.getenv('LOCAL_DIST_PATH') or not dist_dir.is_dir():
+        dist_dir = find_dist_dir(project_dir)
+    return dist_dir
+
+def verify_deployment(dist_dir: Path):
+    """部署后验证线上页面和资源"""
+    verify_url = os.getenv('VERIFY_URL')
+    if not verify_url:
+        print("警告: 未设置 VERIFY_URL，跳过部署验证")
+        return True
+    
+    project_directory()
+    from verify_deploy import run_verification
+    
+    print(f"\n开始部署验证: {verify_url}")
+    timeout = float(os.getenv('VERIFY_TIMEOUT', '30'))
+    expect_gzip = os.getenv('ENABLE_GZIP', 'true').lower() == 'true'
+    return run_verification(verify_url, dist_dir, timeout=timeout, expect_gzip=expect_gzip)
+
+def backup_release(dist_dir: Path):
+    """将已成功部署的构建产物存入内容寻址备份仓库，并清理过期备份"""
+    project_dir = project_directory()
+    from deploy_backup import BackupStore
+    
+    if not dist_dir.is_dir():
+        print(f"警告: 构建目录不存在 {dist_dir}，跳过备份")
+        return
+    
+    store_dir = Path(os.getenv('LOCAL_BACKUP_DIR', 'backups'))
+    if not store_dir.is_absolute():
+        store_dir = project_dir / store_dir
+    store = BackupStore(store_dir)
+    manifest = store.snapshot(dist_dir, prefix=os.getenv('BACKUP_PREFIX', 'vitepress-backup'))
+    stats = manifest['stats']
+    print(f"发布备份: {manifest['release']} ({stats['files']} 个文件，新增对象 {stats['new_objects']} 个)")
+    
+    # 只在部署成功后清理，保证最新的备份就是线上正在运行的版本
+    gc_stats = store.gc(int(os.getenv('BACKUP_RETENTION_DAYS', '7')))
+    if gc_stats['expired_releases']:
+        print(f"清理过期备份: {len(gc_stats['expired_releases'])} 个，回收对象 {gc_stats['removed_objects']} 个")
+
 def run_deployment(args):
     """执行部署"""
+    # 内容寻址备份在本地完成，部署脚本不再打包完整的tar.gz
+    cas_backup = (os.getenv('BACKUP_FORMAT', 'tar.gz') == 'cas'
+                  and os.getenv('ENABLE_BACKUP', 'true').lower() == 'true'
+                  and not args.no_backup)
+    # 备份和验证使用同一个构建目录，保证备份的就是本次部署的内容
+    dist_dir = resolve_dist_dir()
+    
     deploy_dir = setup_environment()
     
     # 验证环境变量
@@ -67,7 +130,7 @@ def run_deployment(args):
         cmd.append('--validate-only')
     if args.no_clean:
         cmd.append('--no-clean')
-    if args.no_backup:
+    if args.no_backup or cas_backup:
         cmd.append('--no-backup')
     if args.force_clean:
         cmd.append('--force-clean')
@@ -84,6 +147,11 @@ def run_deployment(args):
         result = subprocess.run(cmd, check=True, capture_output=True, text=True)
         print("部署成功!")
         print(result.stdout)
+        # 部署失败或中止时不记录备份，也不清理旧备份，回滚目标仍是线上正在运行的版本
+        if cas_backup and not args.dry_run and not args.validate_only:
+            backup_release(dist_dir)
+        if args.verify and not args.dry_run:
+            return verify_deployment(dist_dir)
         return True
     except subprocess.CalledProcessError as e:
         print(f"部署失败: {e}")
@@ -101,6 +169,7 @@ def main():
     parser.add_argument('--force-clean', action='store_true', help='强制清理')
     parser.add_argument('--skip-nginx', action='store_true', help='跳过Nginx配置')
     parser.add_argument('--dry-run', action='store_true', help='模拟运行，不实际执行')
+    parser.add_argument('--verify', action='store_true', help='部署完成后按 VERIFY_URL 验证线上页面和资源')
     
     args = parser.parse_args()
     
@@ -0,0 +1,386 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+内容寻址的部署备份工具
+每次发布只保存一份文件清单（manifest），文件内容按SHA-256存入共享的对象库，
+未变化的图片和音频在多次发布之间只存一份；恢复/回滚即按清单重放，
+过期清单删除后再回收不再被引用的对象
+
+目录结构:
+    <store>/objects/ab/abcdef...   压缩后的文件内容
+    <store>/manifests/<release>.json
+
+用法: python deploy_backup.py snapshot docs/.vitepress/dist
+      python deploy_backup.py list
+      python deploy_backup.py restore <release> <目标目录> [--delete]
+      python deploy_backup.py rollback <目标目录> [--delete]
+
+恢复后在目标目录写入标记文件，记录恢复出的文件；下次恢复只删除上次恢复出、新发布中已不存在的文件，
+目录中的其他文件保持不动。--delete 删除清单之外的所有文件，只允许用于空目录或带标记的目录
+      python deploy_backup.py gc --retention-days 7
+"""
+
+import os
+import sys
+import json
+import stat
+import time
+import zlib
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+MANIFEST_VERSION = 1
+RESTORE_MARKER = '.deploy-backup-restore.json'
+CHUNK_SIZE = 1024 * 1024
+
+# 对象文件首字节标记存储方式
+COMPRESSED = b'Z'
+STORED = b'R'
+
+# 已经压缩过的格式直接存储，不再浪费CPU
+INCOMPRESSIBLE_SUFFIXES = {'.mp3', '.jpg', '.jpeg', '.png', '.gif', '.webp', '.woff', '.woff2', '.gz', '.br', '.zip'}
+
+
+def file_sha256(path: Path) -> str:
+    """流式计算文件的SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def atomic_write(path: Path, data: bytes, mode: Optional[int] = None):
+    """写入临时文件后原子替换，避免中断时留下半个文件；mode 为替换后的文件权限（默认沿用 mkstemp 的 0600）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        if mode is not None:
+            os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+class BackupStore:
+    """内容寻址的备份仓库"""
+
+    def __init__(self, root: Path, workers: Optional[int] = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / 'objects'
+        self.manifests_dir = self.root / 'manifests'
+        self.workers = workers or min(32, (os.cpu_count() or 1) + 4)
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects_dir / digest[:2] / digest[2:]
+
+    # ---------- 写入 ----------
+
+    def _store_file(self, path: Path) -> Tuple[str, int, bool]:
+        """保存单个文件，返回(哈希, 大小, 是否新增对象)"""
+        data = path.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        target = self.object_path(digest)
+        if target.exists():
+            return digest, len(data), False
+        if path.suffix.lower() in INCOMPRESSIBLE_SUFFIXES:
+            payload = STORED + data
+        else:
+            compressed = zlib.compress(data, 6)
+            payload = COMPRESSED + compressed if len(compressed) < len(data) else STORED + data
+        atomic_write(target, payload)
+        return digest, len(data), True
+
+    def snapshot(self, source_dir: Path, release: Optional[str] = None, prefix: str = 'vitepress-backup') -> dict:
+        """为目录创建一个发布快照，返回清单"""
+        source_dir = Path(source_dir)
+        release = release or f"{prefix}-{datetime.now().strftime('%Y%m%d-%H%M%S')}"
+        manifest_path = self.manifests_dir / f"{release}.json"
+        if manifest_path.exists():
+            raise FileExistsError(f"发布已存在: {release}")
+
+        files = []
+        for root, dirs, names in os.walk(source_dir):
+            dirs.sort()
+            for name in sorted(names):
+                if name == RESTORE_MARKER and Path(root) == source_dir:
+                    continue
+                files.append(Path(root) / name)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            results = list(executor.map(self._store_file, files))
+
+        entries = {}
+        new_objects = 0
+        new_bytes = 0
+        for path, (digest, size, created) in zip(files, results):
+            rel_path = path.relative_to(source_dir).as_posix()
+            entries[rel_path] = [digest, size, stat.S_IMODE(path.stat().st_mode)]
+            if created:
+                new_objects += 1
+                new_bytes += size
+
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'release': release,
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'source': str(source_dir),
+            'files': entries,
+        }
+        atomic_write(manifest_path, json.dumps(manifest, ensure_ascii=False, indent=1).encode('utf-8'))
+
+        manifest['stats'] = {
+            'files': len(entries),
+            'total_bytes': sum(size for _, size, _ in entries.values()),
+            'new_objects': new_objects,
+            'new_bytes': new_bytes,
+            'seconds': round(time.perf_counter() - start, 2),
+        }
+        return manifest
+
+    # ---------- 读取 ----------
+
+    def list_releases(self) -> List[dict]:
+        """按创建时间从旧到新列出所有发布"""
+        releases = []
+        if not self.manifests_dir.exists():
+            return releases
+        for manifest_file in self.manifests_dir.glob('*.json'):
+            with open(manifest_file, 'r', encoding='utf-8') as f:
+                releases.append(json.load(f))
+        releases.sort(key=lambda m: (m['created'], m['release']))
+        return releases
+
+    def load_manifest(self, release: str) -> dict:
+        manifest_path = self.manifests_dir / f"{release}.json"
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"发布不存在: {release}")
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def read_object(self, digest: str) -> bytes:
+        payload = self.object_path(digest).read_bytes()
+        marker, body = payload[:1], payload[1:]
+        data = zlib.decompress(body) if marker == COMPRESSED else body
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"对象已损坏: {digest}")
+        return data
+
+    # ---------- 恢复 ----------
+
+    def _restore_file(self, target_dir: Path, rel_path: str, entry: list) -> bool:
+        """恢复单个文件，内容未变化时跳过，返回是否写入"""
+        digest, size, mode = entry
+        target = target_dir / rel_path
+        if target.is_file() and target.stat().st_size == size and file_sha256(target) == digest:
+            return False
+        atomic_write(target, self.read_object(digest))
+        os.chmod(target, mode)
+        return True
+
+    @staticmethod
+    def read_restore_marker(target_dir: Path) -> Optional[dict]:
+        """读取上次恢复写入的标记，没有时返回None"""
+        try:
+            with open(Path(target_dir) / RESTORE_MARKER, 'r', encoding='utf-8') as f:
+                marker = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return marker if isinstance(marker, dict) and isinstance(marker.get('files'), list) else None
+
+    def restore(self, release: str, target_dir: Path, delete: bool = False) -> dict:
+        """按清单重放；默认只删除上次恢复出、本发布中已不存在的文件，delete=True 时删除清单之外的所有文件"""
+        manifest = self.load_manifest(release)
+        target_dir = Path(target_dir)
+        previous = self.read_restore_marker(target_dir)
+        if delete and previous is None and target_dir.is_dir() and any(target_dir.iterdir()):
+            raise ValueError(f"{target_dir} 不是空目录，也不是由 restore 创建的目录，拒绝删除其中的文件")
+        target_dir.mkdir(parents=True, exist_ok=True)
+        files = manifest['files']
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            written = sum(executor.map(lambda item: self._restore_file(target_dir, *item), files.items()))
+
+        removed = 0
+        if delete:
+            # 删除清单之外的文件和空目录
+            for root, dirs, names in os.walk(target_dir, topdown=False):
+                for name in names:
+                    path = Path(root) / name
+                    rel_path = path.relative_to(target_dir).as_posix()
+                    if rel_path not in files and rel_path != RESTORE_MARKER:
+                        path.unlink()
+                        removed += 1
+                if Path(root) != target_dir and not os.listdir(root):
+                    os.rmdir(root)
+        elif previous is not None:
+            for rel_path in previous['files']:
+                if rel_path in files or rel_path.startswith('/') or '..' in rel_path.split('/'):
+                    continue
+                path = target_dir / rel_path
+                if not path.is_file():
+                    continue
+                path.unlink()
+                removed += 1
+                parent = path.parent
+                while parent != target_dir and not os.listdir(parent):
+                    parent.rmdir()
+                    parent = parent.parent
+
+        marker = {'release': release, 'restored': datetime.now().isoformat(timespec='seconds'),
+                  'files': sorted(files)}
+        atomic_write(target_dir / RESTORE_MARKER, json.dumps(marker, ensure_ascii=False, indent=1).encode('utf-8'),
+                     mode=0o644)
+
+        return {
+            'files': len(files),
+            'written': written,
+            'unchanged': len(files) - written,
+            'removed': removed,
+            'seconds': round(time.perf_counter() - start, 2),
+        }
+
+    # ---------- 清理 ----------
+
+    def gc(self, retention_days: int, keep: int = 1) -> dict:
+        """删除过期发布（至少保留最新的keep个），并回收不再被引用的对象"""
+        releases = self.list_releases()
+        cutoff = datetime.now() - timedelta(days=retention_days)
+        protected = {m['release'] for m in releases[-keep:]} if keep > 0 else set()
+
+        expired = [m for m in releases
+                   if m['release'] not in protected and datetime.fromisoformat(m['created']) < cutoff]
+        for manifest in expired:
+            (self.manifests_dir / f"{manifest['release']}.json").unlink()
+
+        expired_names = {m['release'] for m in expired}
+        referenced = set()
+        for manifest in releases:
+            if manifest['release'] in expired_names:
+                continue
+            referenced.update(entry[0] for entry in manifest['files'].values())
+
+        removed_objects = 0
+        freed_bytes = 0
+        if self.objects_dir.exists():
+            for prefix_dir in self.objects_dir.iterdir():
+                for object_file in prefix_dir.iterdir():
+                    if object_file.name.startswith('.tmp-'):
+                        continue
+                    if prefix_dir.name + object_file.name not in referenced:
+                        freed_bytes += object_file.stat().st_size
+                        object_file.unlink()
+                        removed_objects += 1
+                if not any(prefix_dir.iterdir()):
+                    prefix_dir.rmdir()
+
+        return {
+            'expired_releases': [m['release'] for m in expired],
+            'removed_objects': removed_objects,
+            'freed_bytes': freed_bytes,
+        }
+
+
+def format_size(size: int) -> str:
+    for unit in ['B', 'KB', 'MB', 'GB']:
+        if size < 1024 or unit == 'GB':
+            return f"{size:.1f} {unit}" if unit != 'B' else f"{size} B"
+        size /= 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='内容寻址的部署备份工具')
+    parser.add_argument('--store', default=os.getenv('LOCAL_BACKUP_DIR', 'backups'),
+                        help='备份仓库目录 (默认: 环境变量LOCAL_BACKUP_DIR或backups)')
+    parser.add_argument('--workers', type=int, help='并行压缩/恢复的线程数')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    snapshot_parser = subparsers.add_parser('snapshot', help='为构建产物创建发布快照')
+    snapshot_parser.add_argument('source', help='要备份的目录，如 docs/.vitepress/dist')
+    snapshot_parser.add_argument('--release', help='发布名称 (默认: 前缀+时间戳)')
+    snapshot_parser.add_argument('--prefix', default=os.getenv('BACKUP_PREFIX', 'vitepress-backup'), help='发布名称前缀')
+
+    subparsers.add_parser('list', help='列出所有发布')
+
+    restore_parser = subparsers.add_parser('restore', help='将目录恢复到指定发布')
+    restore_parser.add_argument('release', help='发布名称')
+    restore_parser.add_argument('target', help='目标目录')
+    restore_parser.add_argument('--delete', action='store_true',
+                                help='删除清单之外的所有文件（只允许空目录或由restore创建的目录）')
+
+    rollback_parser = subparsers.add_parser('rollback', help='回滚到上一个（或更早的）发布')
+    rollback_parser.add_argument('target', help='目标目录')
+    rollback_parser.add_argument('--steps', type=int, default=1, help='回退的发布数 (默认: 1)')
+    rollback_parser.add_argument('--delete', action='store_true',
+                                 help='删除清单之外的所有文件（只允许空目录或由restore创建的目录）')
+
+    gc_parser = subparsers.add_parser('gc', help='删除过期发布并回收无引用对象')
+    gc_parser.add_argument('--retention-days', type=int, default=int(os.getenv('BACKUP_RETENTION_DAYS', '7')),
+                           help='保留天数 (默认: 环境变量BACKUP_RETENTION_DAYS或7)')
+    gc_parser.add_argument('--keep', type=int, default=1, help='无论是否过期都保留的最新发布数 (默认: 1)')
+
+    args = parser.parse_args()
+    store = BackupStore(Path(args.store), args.workers)
+
+    try:
+        if args.command == 'snapshot':
+            source = Path(args.source)
+            if not source.is_dir():
+                print(f"错误: 目录不存在 {source}")
+                return 1
+            manifest = store.snapshot(source, args.release, args.prefix)
+            stats = manifest['stats']
+            print(f"发布快照已创建: {manifest['release']}")
+            print(f"文件数: {stats['files']} ({format_size(stats['total_bytes'])})")
+            print(f"新增对象: {stats['new_objects']} ({format_size(stats['new_bytes'])})")
+            print(f"耗时: {stats['seconds']} 秒")
+
+        elif args.command == 'list':
+            releases = store.list_releases()
+            if not releases:
+                print("没有备份")
+            for manifest in releases:
+                total = sum(entry[1] for entry in manifest['files'].values())
+                print(f"{manifest['release']}  {manifest['created']}  {len(manifest['files'])} 个文件  {format_size(total)}")
+
+        elif args.command in ('restore', 'rollback'):
+            if args.command == 'rollback':
+                releases = store.list_releases()
+                if len(releases) <= args.steps:
+                    print(f"错误: 没有可回滚的发布（共 {len(releases)} 个）")
+                    return 1
+                release = releases[-1 - args.steps]['release']
+            else:
+                release = args.release
+            stats = store.restore(release, Path(args.target), delete=args.delete)
+            print(f"已恢复到发布: {release}")
+            print(f"写入: {stats['written']}，未变化: {stats['unchanged']}，删除: {stats['removed']}")
+            print(f"耗时: {stats['seconds']} 秒")
+
+        elif args.command == 'gc':
+            stats = store.gc(args.retention_days, args.keep)
+            print(f"过期发布: {len(stats['expired_releases'])} 个")
+            for release in stats['expired_releases']:
+                print(f"  {release}")
+            print(f"回收对象: {stats['removed_objects']} 个 ({format_size(stats['freed_bytes'])})")
+
+    except (FileNotFoundError, FileExistsError, ValueError) as e:
+        print(f"错误: {e}")
+        return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
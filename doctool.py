@@ -0,0 +1,324 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档工具统一入口
+用法: python doctool.py <子命令> [参数]
+各子命令只在执行时才导入对应模块，编辑器钩子等频繁调用的场景不必承担全部工具的导入开销
+"""
+
+import sys
+
+# 直接转交给已有脚本的子命令: 名称 -> (模块, 说明)
+DELEGATED_COMMANDS = {
+    'deploy-verify': ('verify_deploy', '部署后冒烟与延迟验证'),
+    'dist-check': ('check_dist_links', '检查构建产物中的站内链接'),
+    'search-index': ('search_index', '构建离线全文搜索索引'),
+    'dedup': ('near_duplicates', '检测近似重复的诗词页面'),
+    'backup': ('deploy_backup', '内容寻址的部署备份'),
+    'serve': ('link_server', '编辑器链接校验服务（LSP）'),
+    'ignore': ('ignore_rules', '查看和测试忽略规则'),
+}
+
+# assets 的子动作: 名称 -> 模块
+ASSET_ACTIONS = {
+    'fingerprint': 'fingerprint_assets',
+    'audio': 'audio_catalog',
+}
+
+# 启动开销检查时各子命令需要加载的模块
+COMMAND_MODULES = {
+    'check': ['link_batch'],
+    'fix': ['link_batch'],
+    'move': ['link_refs'],
+    'assets': ['link_refs'],
+}
+
+# 这些模块不应出现在 check 的启动路径上
+HEAVY_MODULES = ['requests', 'urllib3', 'http.client', 'concurrent.futures', 'multiprocessing']
+
+# 从导入 doctool 起的全部导入耗时（含 argparse 等标准库，不含解释器自身启动）
+DEFAULT_BUDGET_MS = 50.0
+
+
+def load_command(name: str):
+    """导入子命令依赖的模块（startup-check 用来测量导入开销）"""
+    import importlib
+    if name in DELEGATED_COMMANDS:
+        return [importlib.import_module(DELEGATED_COMMANDS[name][0])]
+    return [importlib.import_module(module) for module in COMMAND_MODULES[name]]
+
+
+def run_module(module_name: str, prog: str, argv: list) -> int:
+    """以prog作为程序名调用脚本的main()，参数由脚本自己解析"""
+    import importlib
+    module = importlib.import_module(module_name)
+    sys.argv = [prog] + argv
+    return module.main() or 0
+
+
+def run_delegated(name: str, argv: list) -> int:
+    return run_module(DELEGATED_COMMANDS[name][0], f'doctool {name}', argv)
+
+
+def collect_markdown_files(paths: list, project_root):
+    """展开命令行给出的文件和目录，未给出时扫描文档目录"""
+    from pathlib import Path
+    from link_batch import find_markdown_files, find_docs_dir
+
+    if not paths:
+        return find_markdown_files(find_docs_dir(project_root), project_root)
+    markdown_files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            markdown_files.extend(find_markdown_files(path, project_root))
+        elif path.suffix == '.md':
+            markdown_files.append(path)
+        else:
+            print(f"跳过非Markdown文件: {path}")
+    return markdown_files
+
+
+def run_link_batch(args, dry_run: bool, auto_fix_threshold=None, diff_output=None) -> int:
+    """check/fix 共用: 支持分片运行和合并分片结果"""
+    from pathlib import Path
+    from link_batch import run_batch, merge_results, parse_shard, timings_path
+
+    if args.merge:
+        return merge_results([Path(p) for p in args.merge], timings_file=timings_path(args))
+    try:
+        shard = parse_shard(args.shard) if args.shard else None
+    except ValueError as e:
+        print(f"错误: {e}")
+        return 2
+
+    project_root = Path.cwd()
+    markdown_files = collect_markdown_files(args.paths, project_root)
+    print(f"找到 {len(markdown_files)} 个Markdown文件")
+    return run_batch(markdown_files, project_root, dry_run=dry_run, verbose=args.verbose,
+                     auto_fix_threshold=auto_fix_threshold, shard=shard,
+                     partial_file=Path(args.partial_output) if args.partial_output else None,
+                     timings_file=timings_path(args), diff_output=diff_output)
+
+
+def cmd_check(args) -> int:
+    return run_link_batch(args, dry_run=True)
+
+
+def cmd_fix(args) -> int:
+    print(f"模式: {'只检查' if args.dry_run else '检查并修复'}")
+    from rewrite_engine import diff_destination
+    return run_link_batch(args, dry_run=args.dry_run, auto_fix_threshold=args.auto_fix_threshold,
+                          diff_output=diff_destination(args))
+
+
+def cmd_move(args) -> int:
+    from pathlib import Path
+    from link_batch import find_docs_dir
+    from link_refs import move_file
+
+    project_root = Path.cwd()
+    destination = Path(args.destination)
+    # 以/结尾表示移动到该目录下（目录可以尚不存在）
+    if args.destination.endswith(('/', '\\')):
+        destination = destination / Path(args.source).name
+    try:
+        move_file(Path(args.source), destination, project_root,
+                  find_docs_dir(project_root), dry_run=args.dry_run)
+    except (FileNotFoundError, FileExistsError) as e:
+        print(f"错误: {e}")
+        return 1
+    return 0
+
+
+def cmd_assets(args) -> int:
+    if args.action in ASSET_ACTIONS:
+        return run_module(ASSET_ACTIONS[args.action], f'doctool assets {args.action}', args.options)
+
+    from pathlib import Path
+    from link_batch import find_docs_dir, display_path
+    from link_refs import check_assets
+
+    project_root = Path.cwd()
+    docs_root = find_docs_dir(project_root)
+    orphans, missing = check_assets(docs_root, project_root)
+
+    print(f"=== 资源文件检查 ===")
+    print(f"未被引用的资源: {len(orphans)}")
+    print(f"缺失的资源: {len(missing)}")
+
+    if orphans:
+        print(f"\n未被引用的资源:")
+        for asset in orphans:
+            print(f"  {display_path(asset, project_root.resolve())}")
+    if missing:
+        print(f"\n缺失的资源:")
+        for target, refs in sorted(missing.items()):
+            print(f"  {display_path(target, project_root.resolve())}")
+            for md_file, link in refs[:3]:
+                print(f"    {display_path(md_file, project_root.resolve())}: {link}")
+    if not orphans and not missing:
+        print("\n✅ 所有资源文件都正常!")
+
+    return 1 if missing or (orphans and args.strict) else 0
+
+
+def project_modules() -> set:
+    """与 doctool 同目录的顶层模块名"""
+    import os
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    return {name[:-3] for name in os.listdir(script_dir) if name.endswith('.py')}
+
+
+def warm_bytecode():
+    """预先编译项目模块，避免把首次编译 .pyc 的时间算进启动耗时"""
+    import os
+    import compileall
+    compileall.compile_dir(os.path.dirname(os.path.abspath(__file__)), maxlevels=0, quiet=1)
+
+
+def measure_import_time(command: str) -> tuple:
+    """在子进程中用 -X importtime 加载子命令
+
+    返回(总导入耗时毫秒, 项目模块自身耗时毫秒, [(累计耗时微秒, 顶层导入), ...], 已加载的模块)
+    """
+    import os
+    import subprocess
+
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    # 与真实调用一致: 导入入口、构建该子命令的参数解析器、加载子命令模块
+    code = f"import doctool; doctool.build_parser({command!r}); doctool.load_command({command!r})"
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=script_dir, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1] if result.stderr.strip() else '导入失败')
+
+    # 解释器启动时的导入（site 等）出现在 doctool 之前，不计入；
+    # 之后每个顶层导入的累计耗时之和即为命令带来的启动开销
+    own = project_modules()
+    top_level = []
+    project_us = 0
+    loaded = set()
+    started = False
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        loaded.add(name.strip())
+        started = started or name.strip() == 'doctool'
+        if not started:
+            continue
+        if name.split('.')[0].strip() in own:
+            project_us += int(self_us)
+        # 嵌套导入带缩进，只有顶层导入的累计耗时不会重复计算
+        if not name[1:].startswith(' '):
+            top_level.append((int(cumulative_us), name.strip()))
+    total_ms = sum(cumulative_us for cumulative_us, _ in top_level) / 1000
+    top_level.sort(reverse=True)
+    return total_ms, project_us / 1000, top_level, loaded
+
+
+def cmd_startup_check(args) -> int:
+    unknown = [command for command in args.commands if command not in COMMAND_MODULES]
+    if unknown:
+        print(f"错误: 未知的子命令 {', '.join(unknown)}")
+        return 2
+
+    warm_bytecode()
+    ok = True
+    for command in args.commands or ['check']:
+        # 取多次中的最小值，减少机器抖动的影响
+        samples = [measure_import_time(command) for _ in range(args.repeat)]
+        total_ms, project_ms, modules, loaded = min(samples, key=lambda sample: sample[0])
+        heavy = [name for name in HEAVY_MODULES if name in loaded]
+        within = total_ms <= args.budget_ms and not heavy
+        ok = ok and within
+
+        print(f"{'✅' if within else '❌'} {command}: 导入耗时 {total_ms:.1f} ms "
+              f"(其中项目模块 {project_ms:.1f} ms，预算 {args.budget_ms:.0f} ms)")
+        for cumulative_us, name in modules[:args.top]:
+            print(f"    {cumulative_us / 1000:7.1f} ms  {name}")
+        if heavy:
+            print(f"    不应加载的模块: {', '.join(heavy)}")
+
+    return 0 if ok else 1
+
+
+def build_parser(command: str = None):
+    """构建参数解析器；给出 command 时只为该子命令添加完整参数，其余子命令只登记名称"""
+    import argparse
+    parser = argparse.ArgumentParser(prog='doctool', description='古诗词文档工具集')
+    subparsers = parser.add_subparsers(dest='command', metavar='<子命令>')
+
+    def wanted(name: str) -> bool:
+        return command is None or command == name
+
+    check = subparsers.add_parser('check', help='检查Markdown文件中的链接')
+    if wanted('check'):
+        from link_batch import add_shard_arguments
+        check.add_argument('paths', nargs='*', help='要检查的文件或目录 (默认: 文档目录)')
+        check.add_argument('--verbose', '-v', action='store_true', help='显示详细信息')
+        add_shard_arguments(check)
+        check.set_defaults(handler=cmd_check)
+
+    fix = subparsers.add_parser('fix', help='修复Markdown文件中的链接')
+    if wanted('fix'):
+        from link_batch import add_shard_arguments
+        from rewrite_engine import add_diff_arguments
+        fix.add_argument('paths', nargs='*', help='要修复的文件或目录 (默认: 文档目录)')
+        fix.add_argument('--dry-run', action='store_true', help='只检查不修改文件')
+        fix.add_argument('--verbose', '-v', action='store_true', help='显示详细信息')
+        fix.add_argument('--auto-fix-threshold', type=float, help='相似文件推荐得分不低于该值(0-1)时自动修复链接')
+        add_diff_arguments(fix)
+        add_shard_arguments(fix)
+        fix.set_defaults(handler=cmd_fix)
+
+    move = subparsers.add_parser('move', help='移动文件并同步改写所有引用')
+    if wanted('move'):
+        move.add_argument('source', help='要移动的文件')
+        move.add_argument('destination', help='目标路径或目录')
+        move.add_argument('--dry-run', action='store_true', help='只显示将要改写的链接')
+        move.set_defaults(handler=cmd_move)
+
+    assets = subparsers.add_parser('assets', help='资源文件: 检查引用 / 指纹化构建 / 音频目录')
+    if wanted('assets'):
+        assets.add_argument('action', nargs='?', choices=['check'] + list(ASSET_ACTIONS), default='check',
+                            help='check: 检查资源引用 (默认); fingerprint: 生成内容哈希命名的文档副本; '
+                                 'audio: 解析音频时长并优化播放器嵌入')
+        assets.add_argument('options', nargs=argparse.REMAINDER,
+                            help='fingerprint/audio 的参数，见 doctool assets <动作> -h')
+        assets.add_argument('--strict', action='store_true', help='存在未被引用的资源时也返回非零')
+        assets.set_defaults(handler=cmd_assets)
+
+    startup = subparsers.add_parser('startup-check', help='检查子命令的导入耗时是否在预算内')
+    if wanted('startup-check'):
+        startup.add_argument('commands', nargs='*', metavar='command',
+                             help=f"要检查的子命令: {', '.join(sorted(COMMAND_MODULES))} (默认: check)")
+        startup.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                             help=f'导入耗时预算，毫秒 (默认: {DEFAULT_BUDGET_MS:.0f})')
+        startup.add_argument('--repeat', type=int, default=3, help='测量次数，取最小值 (默认: 3)')
+        startup.add_argument('--top', type=int, default=5, help='列出累计耗时最高的顶层导入数 (默认: 5)')
+        startup.set_defaults(handler=cmd_startup_check)
+
+    for name, (_, description) in DELEGATED_COMMANDS.items():
+        subparsers.add_parser(name, help=description, add_help=False)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+
+    # 转交的子命令由对应脚本自己解析参数
+    if argv and argv[0] in DELEGATED_COMMANDS:
+        return run_delegated(argv[0], argv[1:])
+
+    parser = build_parser(argv[0] if argv and not argv[0].startswith('-') else None)
+    args = parser.parse_args(argv)
+    if not getattr(args, 'handler', None):
+        parser.print_help()
+        return 1
+    return args.handler(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+静态资源指纹化构建步骤
+将文档目录复制到输出目录，其中 docs/*/data 下的图片、音频等资源改名为
+<文件名>.<内容哈希><扩展名>，并改写所有Markdown和内嵌HTML中的引用。
+内容不变的资源在多次发布之间文件名不变，清单可供单独上传资源（如CDN）时使用。
+注意 VitePress 构建时会把页面引用的资源再次按内容哈希重命名到 /assets/，
+站点的长期缓存规则针对 /assets/ 配置（见 DEPLOYMENT.md），不依赖本工具生成的文件名。
+
+用法: python fingerprint_assets.py --output .cache/docs-fingerprinted
+      DOCS_SRC_DIR=.cache/docs-fingerprinted npm run docs:build
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+from pathlib import Path
+from typing import Dict, Optional
+
+from deploy_backup import file_sha256, atomic_write
+from ignore_rules import get_matcher
+from link_refs import rewrite_links
+
+MANIFEST_NAME = 'asset-manifest.json'
+MANIFEST_VERSION = 2
+MANIFEST_GENERATOR = 'fingerprint_assets'
+DEFAULT_OUTPUT = '.cache/docs-fingerprinted'
+DEFAULT_HASH_LENGTH = 8
+
+
+def is_data_asset(rel_path: str) -> bool:
+    """是否为 <分类>/data/ 下的资源文件"""
+    parts = rel_path.split('/')
+    return len(parts) >= 3 and parts[1] == 'data' and not rel_path.endswith('.md')
+
+
+def fingerprinted_name(rel_path: str, digest: str, hash_length: int = DEFAULT_HASH_LENGTH) -> str:
+    """在扩展名前插入内容哈希，如 data/images/登高.jpg -> data/images/登高.3f2a1b4c.jpg"""
+    directory, _, name = rel_path.rpartition('/')
+    stem, dot, suffix = name.rpartition('.')
+    if not dot:
+        stem, suffix = name, ''
+    new_name = f"{stem}.{digest[:hash_length]}{'.' + suffix if dot else ''}"
+    return f"{directory}/{new_name}" if directory else new_name
+
+
+def load_manifest(output_dir: Path) -> Optional[Dict]:
+    """读取本工具上次生成的清单（用于复用哈希和清理旧文件），不存在或不是本工具生成的返回None"""
+    try:
+        with open(output_dir / MANIFEST_NAME, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if (isinstance(manifest, dict) and manifest.get('generator') == MANIFEST_GENERATOR
+            and manifest.get('version') == MANIFEST_VERSION and isinstance(manifest.get('files'), list)):
+        return manifest
+    return None
+
+
+def list_source_files(docs_dir: Path, project_root: Path):
+    """文档目录下需要复制的文件（相对路径，posix格式）"""
+    files = []
+    for root, dirs, names in get_matcher(project_root).walk(docs_dir):
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
+        rel_root = os.path.relpath(root, docs_dir).replace(os.sep, '/')
+        prefix = '' if rel_root == '.' else rel_root + '/'
+        files.extend(prefix + name for name in names if not name.startswith('.'))
+    return sorted(files)
+
+
+def copy_if_changed(source: Path, destination: Path) -> bool:
+    """目标不存在或大小/修改时间不同时才复制，返回是否复制"""
+    try:
+        src_stat = source.stat()
+        dst_stat = destination.stat()
+        if src_stat.st_size == dst_stat.st_size and int(src_stat.st_mtime) == int(dst_stat.st_mtime):
+            return False
+    except FileNotFoundError:
+        pass
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    shutil.copy2(source, destination)
+    return True
+
+
+def fingerprint_docs(docs_dir: Path, output_dir: Path, project_root: Optional[Path] = None,
+                     hash_length: int = DEFAULT_HASH_LENGTH) -> Dict:
+    """生成指纹化的文档副本和资源清单，返回统计信息"""
+    docs_dir = Path(os.path.abspath(docs_dir))
+    output_dir = Path(os.path.abspath(output_dir))
+    project_root = Path(os.path.abspath(project_root or docs_dir.parent))
+
+    if output_dir == docs_dir or docs_dir in output_dir.parents or output_dir in docs_dir.parents:
+        raise ValueError(f"输出目录不能与文档目录重叠: {output_dir}")
+
+    manifest = load_manifest(output_dir)
+    previous = manifest['assets'] if manifest else {}
+    files = list_source_files(docs_dir, project_root)
+    stats = {'assets': 0, 'hashed': 0, 'copied': 0, 'pages': 0, 'rewritten_links': 0, 'removed': 0}
+
+    # 1. 资源文件: 计算哈希（大小和修改时间未变时沿用上次的结果）
+    assets = {}
+    mapping = {}
+    for rel_path in filter(is_data_asset, files):
+        source = docs_dir / rel_path
+        st = source.stat()
+        entry = previous.get(rel_path)
+        if entry and entry.get('size') == st.st_size and entry.get('mtime_ns') == st.st_mtime_ns:
+            digest = entry['sha256']
+        else:
+            digest = file_sha256(source)
+            stats['hashed'] += 1
+        target = fingerprinted_name(rel_path, digest, hash_length)
+        assets[rel_path] = {'file': target, 'sha256': digest, 'size': st.st_size, 'mtime_ns': st.st_mtime_ns}
+        mapping[Path(os.path.normpath(source))] = Path(os.path.normpath(docs_dir / target))
+        stats['assets'] += 1
+        if copy_if_changed(source, output_dir / target):
+            stats['copied'] += 1
+
+    # 2. 其余文件原样复制，Markdown改写对资源的引用
+    produced = {info['file'] for info in assets.values()}
+    for rel_path in files:
+        if rel_path in assets:
+            continue
+        source = docs_dir / rel_path
+        destination = output_dir / rel_path
+        produced.add(rel_path)
+        if not rel_path.endswith('.md'):
+            if copy_if_changed(source, destination):
+                stats['copied'] += 1
+            continue
+
+        stats['pages'] += 1
+        content = source.read_text(encoding='utf-8')
+        new_content, changes = rewrite_links(content, source.parent, source.parent, docs_dir, mapping)
+        stats['rewritten_links'] += len(changes)
+        data = new_content.encode('utf-8')
+        try:
+            unchanged = destination.read_bytes() == data
+        except FileNotFoundError:
+            unchanged = False
+        if not unchanged:
+            atomic_write(destination, data, mode=source.stat().st_mode & 0o7777)
+            stats['copied'] += 1
+
+    # 3. 删除上次清单中记录、本次不再产生的文件（如内容变化前的旧指纹文件）；
+    #    没有本工具的清单时不删除任何文件，避免 --output 写错时误删无关文件
+    for rel_path in (manifest['files'] if manifest else []):
+        if rel_path in produced or rel_path.startswith('/') or '..' in rel_path.split('/'):
+            continue
+        stale = output_dir / rel_path
+        if stale.is_file():
+            stale.unlink()
+            stats['removed'] += 1
+
+    manifest = {
+        'generator': MANIFEST_GENERATOR,
+        'version': MANIFEST_VERSION,
+        'generated': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'hash_length': hash_length,
+        'assets': assets,
+        'files': sorted(produced),
+    }
+    atomic_write(output_dir / MANIFEST_NAME,
+                 json.dumps(manifest, ensure_ascii=False, indent=2, sort_keys=True).encode('utf-8'))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='资源文件指纹化并改写引用')
+    parser.add_argument('--docs', default='docs', help='文档目录 (默认: docs)')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT, help=f'输出目录 (默认: {DEFAULT_OUTPUT})')
+    parser.add_argument('--hash-length', type=int, default=DEFAULT_HASH_LENGTH,
+                        help=f'文件名中的哈希长度 (默认: {DEFAULT_HASH_LENGTH})')
+
+    args = parser.parse_args()
+
+    docs_dir = Path(args.docs)
+    if not docs_dir.is_dir():
+        print(f"错误: 文档目录不存在 {docs_dir}")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        stats = fingerprint_docs(docs_dir, Path(args.output), Path.cwd(), args.hash_length)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    print(f"=== 资源指纹化 ===")
+    print(f"输出目录: {args.output}")
+    print(f"资源文件数: {stats['assets']} (重新计算哈希 {stats['hashed']})")
+    print(f"页面数: {stats['pages']}")
+    print(f"改写引用数: {stats['rewritten_links']}")
+    print(f"写入文件数: {stats['copied']}")
+    print(f"清理旧文件数: {stats['removed']}")
+    print(f"耗时: {elapsed:.2f} 秒")
+    print(f"\n💡 使用 DOCS_SRC_DIR={args.output} npm run docs:build 构建指纹化后的站点")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+目录遍历忽略规则
+读取项目根目录下的 .gitignore 和 .doctoolignore，编译为正则表达式，
+供各个遍历目录的工具在进入子目录之前剪枝（如 .git、node_modules、.vitepress/dist）
+
+用法: python ignore_rules.py --benchmark [目录]
+      python ignore_rules.py --synthetic 20000
+"""
+
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+IGNORE_FILES = ['.gitignore', '.doctoolignore']
+
+# 无论忽略文件如何配置都要跳过的目录
+BUILTIN_PATTERNS = ['.git/']
+
+
+def translate_pattern(pattern: str) -> Optional[Tuple[re.Pattern, bool, bool]]:
+    """将一条gitignore规则转换为(正则, 是否取反, 是否只匹配目录)，空行和注释返回None"""
+    pattern = pattern.rstrip('\n').rstrip()
+    if not pattern or pattern.startswith('#'):
+        return None
+
+    negate = pattern.startswith('!')
+    if negate:
+        pattern = pattern[1:]
+    elif pattern.startswith('\\'):
+        pattern = pattern[1:]
+
+    dir_only = pattern.endswith('/')
+    pattern = pattern.rstrip('/')
+    if not pattern:
+        return None
+
+    # 包含斜杠的规则相对于根目录，否则匹配任意层级
+    anchored = '/' in pattern
+    pattern = pattern.lstrip('/')
+
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        char = pattern[i]
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+            continue
+        if pattern.startswith('/**', i) and i + 3 == len(pattern):
+            regex += '/.*'
+            i += 3
+            continue
+        if pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+            continue
+        if char == '*':
+            regex += '[^/]*'
+        elif char == '?':
+            regex += '[^/]'
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end == -1:
+                regex += re.escape(char)
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                regex += f'[{body}]'
+                i = end
+        elif char == '\\' and i + 1 < len(pattern):
+            i += 1
+            regex += re.escape(pattern[i])
+        else:
+            regex += re.escape(char)
+        i += 1
+
+    prefix = '' if anchored else '(?:.*/)?'
+    return re.compile(f'^{prefix}{regex}$'), negate, dir_only
+
+
+class IgnoreMatcher:
+    """编译后的忽略规则，路径均为相对于项目根目录的posix路径"""
+
+    def __init__(self, root: Path, patterns: Optional[List[str]] = None):
+        # 同时保留字面路径和真实路径: os.walk 产生的路径沿用调用方给出的写法（可能经过符号链接）
+        self.root = Path(os.path.abspath(root))
+        self._root_str = str(self.root)
+        self._real_root_str = os.path.realpath(root)
+        if patterns is None:
+            patterns = list(BUILTIN_PATTERNS)
+            for name in IGNORE_FILES:
+                ignore_file = self.root / name
+                if ignore_file.is_file():
+                    patterns.extend(ignore_file.read_text(encoding='utf-8').splitlines())
+        self.rules = [rule for rule in map(translate_pattern, patterns) if rule]
+
+        # 没有取反规则时合并为一个正则，一次匹配即可得出结果
+        self._has_negation = any(negate for _, negate, _ in self.rules)
+        if not self._has_negation:
+            self._any_path = self._combine([r for r, _, dir_only in self.rules if not dir_only])
+            self._any_dir = self._combine([r for r, _, _ in self.rules])
+
+    @staticmethod
+    def _combine(regexes: List[re.Pattern]) -> Optional[re.Pattern]:
+        if not regexes:
+            return None
+        return re.compile('|'.join(f'(?:{r.pattern})' for r in regexes))
+
+    def is_ignored(self, rel_path: str, is_dir: bool = False) -> bool:
+        """判断相对路径是否被忽略，后出现的规则优先"""
+        if not self._has_negation:
+            combined = self._any_dir if is_dir else self._any_path
+            return bool(combined and combined.match(rel_path))
+        for regex, negate, dir_only in reversed(self.rules):
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                return not negate
+        return False
+
+    def relative(self, path) -> str:
+        """绝对路径转换为相对于根目录的posix路径，根目录之外返回None"""
+        # 两边用同一种方式规范化: 先比较字面路径，不在根目录下时再比较解析符号链接后的真实路径
+        rel_path = self._relative_to(os.path.abspath(path), self._root_str)
+        if rel_path is None:
+            rel_path = self._relative_to(os.path.realpath(path), self._real_root_str)
+        return rel_path
+
+    @staticmethod
+    def _relative_to(path: str, root: str) -> Optional[str]:
+        if path == root:
+            return ''
+        if not path.startswith(root + os.sep):
+            return None
+        return path[len(root) + 1:].replace(os.sep, '/')
+
+    def prune(self, root: str, dirs: List[str]):
+        """原地剔除被忽略的子目录，用于os.walk的dirs列表"""
+        rel_root = self.relative(root)
+        if rel_root is None:
+            return
+        prefix = rel_root + '/' if rel_root else ''
+        dirs[:] = [d for d in dirs if not self.is_ignored(prefix + d, is_dir=True)]
+
+    def walk(self, top) -> Iterator[Tuple[str, List[str], List[str]]]:
+        """与os.walk相同，但跳过被忽略的目录和文件"""
+        for root, dirs, files in os.walk(top):
+            self.prune(root, dirs)
+            rel_root = self.relative(root)
+            if rel_root is not None:
+                prefix = rel_root + '/' if rel_root else ''
+                files = [f for f in files if not self.is_ignored(prefix + f)]
+            yield root, dirs, files
+
+
+_matchers: Dict[Path, IgnoreMatcher] = {}
+
+
+def get_matcher(root) -> IgnoreMatcher:
+    """按项目根目录缓存的忽略规则"""
+    key = Path(os.path.realpath(root))
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = IgnoreMatcher(root)
+        _matchers[key] = matcher
+    return matcher
+
+
+def _timed_walk(walker) -> Tuple[int, int, float]:
+    start = time.perf_counter()
+    dir_count = file_count = 0
+    for _, _, files in walker:
+        dir_count += 1
+        file_count += len(files)
+    return dir_count, file_count, (time.perf_counter() - start) * 1000
+
+
+def create_synthetic_project(root: Path, dependency_files: int):
+    """生成一个带有大量依赖文件的模拟项目"""
+    (root / 'docs' / 'history').mkdir(parents=True)
+    for i in range(50):
+        (root / 'docs' / 'history' / f'poem_{i}.md').write_text('# poem\n', encoding='utf-8')
+    (root / '.gitignore').write_text('node_modules/\n.vitepress/dist/\n', encoding='utf-8')
+    per_package = 20
+    for i in range(max(1, dependency_files // per_package)):
+        package = root / 'node_modules' / f'pkg_{i}' / 'lib'
+        package.mkdir(parents=True)
+        for j in range(per_package):
+            (package / f'mod_{j}.js').write_bytes(b'')
+
+
+def run_benchmark(root: Path, repeat: int = 3):
+    """对比不剪枝与剪枝两种遍历方式的耗时"""
+    matcher = IgnoreMatcher(root)
+    full = min((_timed_walk(os.walk(root)) for _ in range(repeat)), key=lambda r: r[2])
+    pruned = min((_timed_walk(matcher.walk(root)) for _ in range(repeat)), key=lambda r: r[2])
+
+    print(f"=== 目录遍历基准 ({root}) ===")
+    print(f"忽略规则: {len(matcher.rules)} 条")
+    print(f"不剪枝: {full[0]} 个目录, {full[1]} 个文件, {full[2]:.2f} ms")
+    print(f"剪枝后: {pruned[0]} 个目录, {pruned[1]} 个文件, {pruned[2]:.2f} ms")
+    if pruned[2] > 0:
+        print(f"加速比: {full[2] / pruned[2]:.1f}x")
+
+
+def main():
+    # 仅命令行工具需要，避免拖慢作为库导入时的启动
+    import shutil
+    import argparse
+    import tempfile
+
+    parser = argparse.ArgumentParser(description='忽略规则工具')
+    parser.add_argument('path', nargs='?', default='.', help='项目根目录 (默认: 当前目录)')
+    parser.add_argument('--benchmark', action='store_true', help='对比剪枝前后的遍历耗时')
+    parser.add_argument('--synthetic', type=int, metavar='N', help='在临时目录中生成带N个依赖文件的模拟项目做基准')
+    parser.add_argument('--check', metavar='REL_PATH', help='检查某个相对路径是否被忽略')
+
+    args = parser.parse_args()
+
+    if args.synthetic:
+        temp_dir = Path(tempfile.mkdtemp(prefix='ignore-bench-'))
+        try:
+            create_synthetic_project(temp_dir, args.synthetic)
+            run_benchmark(temp_dir)
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+        return 0
+
+    root = Path(args.path)
+    if args.check:
+        matcher = IgnoreMatcher(root)
+        is_dir = (root / args.check).is_dir()
+        ignored = matcher.is_ignored(args.check.strip('/'), is_dir=is_dir)
+        print(f"{args.check}: {'忽略' if ignored else '不忽略'}")
+        return 0
+
+    if args.benchmark:
+        run_benchmark(root)
+        return 0
+
+    matcher = IgnoreMatcher(root)
+    print(f"=== 忽略规则 ({matcher.root}) ===")
+    for regex, negate, dir_only in matcher.rules:
+        print(f"  {'!' if negate else ' '} {regex.pattern}{' (仅目录)' if dir_only else ''}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量链接检查/修复的公共逻辑
+validate_all_links.py、fix_all_links.py 和 doctool 的 check/fix 子命令共用
+
+分片模式（--shard i/N）按文件大小或历史耗时把文件均衡分配到N个CI节点，
+每个分片写出部分结果，--merge 合并后得到与单节点运行相同的总结和退出码。
+各节点必须使用同一份耗时记录（如从CI缓存恢复），否则分配不一致，合并时会报错
+"""
+
+import os
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from link_validator import LinkValidator
+from ignore_rules import get_matcher
+from rewrite_engine import RewriteSession
+
+RESULT_VERSION = 1
+DEFAULT_SHARD_DIR = '.cache/link-shards'
+DEFAULT_TIMINGS_FILE = '.cache/link-timings.json'
+
+
+def find_markdown_files(directory: Path, project_root: Path = None) -> list:
+    """查找目录中的所有Markdown文件"""
+    matcher = get_matcher(project_root or directory)
+    markdown_files = []
+    for root, dirs, files in matcher.walk(directory):
+        # 跳过隐藏目录和node_modules，其余按 .gitignore / .doctoolignore 剪枝
+        dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'node_modules']
+
+        for file in files:
+            if file.endswith('.md'):
+                markdown_files.append(Path(root) / file)
+
+    # 遍历顺序取决于文件系统，排序后分片分配和输出在各机器上一致
+    return sorted(markdown_files)
+
+
+def find_docs_dir(project_root: Path) -> Path:
+    """项目中的文档目录，没有docs目录时使用项目根目录"""
+    if (project_root / 'docs').exists():
+        return project_root / 'docs'
+    return project_root
+
+
+def display_path(file_path: Path, project_root: Path) -> Path:
+    try:
+        return file_path.relative_to(project_root)
+    except ValueError:
+        return file_path
+
+
+def result_key(file_path: Path, project_root: Path) -> str:
+    """结果文件和耗时记录中使用的文件标识（相对项目根目录，posix格式）"""
+    return display_path(file_path, project_root).as_posix()
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """解析 i/N 格式的分片参数（i从1开始）"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise ValueError(f"分片参数格式应为 i/N: {value}")
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"分片序号超出范围: {value}")
+    return index, count
+
+
+def load_timings(timings_file: Optional[Path]) -> Dict[str, float]:
+    if not timings_file:
+        return {}
+    try:
+        with open(timings_file, 'r', encoding='utf-8') as f:
+            return {key: float(value) for key, value in json.load(f).items()}
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+
+def save_timings(timings_file: Path, records: List[Dict]):
+    """用本次运行的耗时更新历史记录，供下次分片使用"""
+    timings = load_timings(timings_file)
+    timings.update({record['path']: round(record['seconds'], 6) for record in records})
+    timings_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(timings_file, 'w', encoding='utf-8') as f:
+        json.dump(timings, f, ensure_ascii=False, indent=2, sort_keys=True)
+
+
+def timings_digest(timings: Dict[str, float]) -> str:
+    # 只在分片模式下需要，不放在模块级以免拖慢 check 的启动
+    import hashlib
+    return hashlib.sha1(json.dumps(timings, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+
+
+def assign_shards(markdown_files: List[Path], count: int, project_root: Path,
+                  timings: Dict[str, float] = None) -> List[List[Path]]:
+    """按权重贪心分配（最长处理时间优先），同样的输入在所有节点上得到同样的分配"""
+    timings = timings or {}
+    keys = [result_key(f, project_root) for f in markdown_files]
+    sizes = {key: max(1, os.path.getsize(f)) for key, f in zip(keys, markdown_files)}
+
+    # 有历史耗时的文件用耗时，其余按已知文件的平均每字节耗时由大小估算
+    known = [key for key in keys if key in timings]
+    known_size = sum(sizes[key] for key in known)
+    rate = sum(timings[key] for key in known) / known_size if known and known_size else 0
+    weights = {key: timings[key] if key in timings else sizes[key] * rate if rate else sizes[key]
+               for key in keys}
+
+    shards = [[] for _ in range(count)]
+    loads = [0.0] * count
+    for key, md_file in sorted(zip(keys, markdown_files), key=lambda item: (-weights[item[0]], item[0])):
+        target = min(range(count), key=lambda i: (loads[i], i))
+        shards[target].append(md_file)
+        loads[target] += weights[key]
+
+    # 分片内保持原有的遍历顺序，输出与单节点一致
+    order = {f: i for i, f in enumerate(markdown_files)}
+    return [sorted(shard, key=order.get) for shard in shards]
+
+
+def process_files(markdown_files: List[Path], project_root: Path, dry_run: bool = True,
+                  verbose: bool = False, auto_fix_threshold: Optional[float] = None,
+                  orders: List[int] = None, writer: Optional[RewriteSession] = None) -> List[Dict]:
+    """逐个文件检查/修复链接，返回每个文件的结果记录"""
+    records = []
+    for i, md_file in enumerate(markdown_files):
+        if verbose:
+            print(f"\n{'='*60}")
+        else:
+            print(f"处理: {display_path(md_file, project_root)}")
+
+        start = time.perf_counter()
+        validator = LinkValidator(str(md_file), dry_run=dry_run, auto_fix_threshold=auto_fix_threshold,
+                                  writer=writer)
+        validator.validate_and_fix()
+
+        records.append({
+            'path': result_key(md_file, project_root),
+            'order': orders[i] if orders else i,
+            'links': validator.total_links,
+            'broken': validator.broken_links,
+            'fixed': validator.fixes_count,
+            'seconds': time.perf_counter() - start,
+        })
+    return records
+
+
+def print_summary(records: List[Dict], dry_run: bool = True, title: str = None,
+                  fix_hint: bool = False) -> int:
+    """打印批量总结，全部正常时返回0"""
+    records = sorted(records, key=lambda record: record['order'])
+    total_broken = sum(record['broken'] for record in records)
+    total_fixed = sum(record['fixed'] for record in records)
+
+    title = title or ('检查' if dry_run else '修复')
+    print(f"\n{'='*60}")
+    print(f"=== 批量{title}总结 ===")
+    print(f"检查文件数: {len(records)}")
+    print(f"总链接数: {sum(record['links'] for record in records)}")
+    print(f"损坏链接数: {total_broken}")
+    print(f"{'可修复' if dry_run else '已修复'}链接数: {total_fixed}")
+
+    files_modified = [record for record in records if record['fixed'] > 0 and not dry_run]
+    if files_modified:
+        print(f"\n已修改的文件:")
+        for record in files_modified:
+            print(f"  {record['path']}: 修复了 {record['fixed']} 个链接")
+
+    files_with_issues = [record for record in records if record['broken'] > 0]
+    if files_with_issues:
+        print(f"\n{'有问题' if dry_run else '仍有问题'}的文件:")
+        for record in files_with_issues:
+            print(f"  {record['path']}: {record['broken']} 个损坏链接")
+    else:
+        print("\n✅ 所有链接都正常!")
+
+    if fix_hint and dry_run and total_fixed > 0:
+        print(f"\n💡 运行 'python fix_all_links.py' 来自动修复 {total_fixed} 个链接")
+
+    return 0 if total_broken == 0 else 1
+
+
+def print_cache_stats():
+    """打印本次运行中链接解析缓存的命中情况"""
+    stats = LinkValidator.cache_stats()
+    hits, misses = stats['resolve_hits'], stats['resolve_misses']
+    rate = hits / (hits + misses) * 100 if hits + misses else 0
+    print(f"\n缓存统计:")
+    print(f"  链接解析: 命中 {hits} / 未命中 {misses} (命中率 {rate:.1f}%)")
+
+
+def run_batch(markdown_files: List[Path], project_root: Path, dry_run: bool = True,
+              verbose: bool = False, auto_fix_threshold: Optional[float] = None,
+              title: str = None, fix_hint: bool = False, shard: Tuple[int, int] = None,
+              partial_file: Optional[Path] = None, timings_file: Optional[Path] = None,
+              diff_output: Optional[str] = None) -> int:
+    """批量检查/修复并打印总结；指定shard时只处理该分片的文件并写出部分结果
+
+    所有修改在处理完全部文件后才统一原子写入；diff_output 为文件路径或 '-'（标准输出）时输出统一diff
+    """
+    orders = None
+    if shard is not None:
+        index, count = shard
+        timings = load_timings(timings_file)
+        order = {f: i for i, f in enumerate(markdown_files)}
+        shard_files = assign_shards(markdown_files, count, project_root, timings)[index - 1]
+        orders = [order[f] for f in shard_files]
+        print(f"分片 {index}/{count}: 处理 {len(shard_files)}/{len(markdown_files)} 个文件")
+    else:
+        shard_files = markdown_files
+
+    with LinkValidator.shared_caches(), \
+            RewriteSession(project_root, dry_run=dry_run, collect_diff=diff_output is not None) as session:
+        records = process_files(shard_files, project_root, dry_run, verbose, auto_fix_threshold,
+                                orders=orders, writer=session)
+    for path in session.updated:
+        print(f"文件已更新: {path}")
+
+    if diff_output is not None:
+        if diff_output == '-':
+            print(f"\n{'='*60}")
+        session.write_diff(diff_output)
+        if diff_output != '-':
+            print(f"\n统一diff已写入: {diff_output} ({len(session.diffs)} 个文件)")
+
+    if shard is None:
+        if timings_file:
+            save_timings(timings_file, records)
+        exit_code = print_summary(records, dry_run, title, fix_hint)
+        print_cache_stats()
+        return exit_code
+
+    partial_file = partial_file or project_root / DEFAULT_SHARD_DIR / f'shard-{index}-of-{count}.json'
+    partial_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(partial_file, 'w', encoding='utf-8') as f:
+        json.dump({
+            'version': RESULT_VERSION,
+            'shard': index,
+            'shards': count,
+            'dry_run': dry_run,
+            'total_files': len(markdown_files),
+            # 所有分片必须基于同一份耗时记录计算分配，合并时校验
+            'timings_digest': timings_digest(timings),
+            'files': records,
+        }, f, ensure_ascii=False, indent=2)
+    print(f"\n部分结果已写入: {partial_file}")
+
+    exit_code = print_summary(records, dry_run, f"{title or ('检查' if dry_run else '修复')}（分片 {index}/{count}）")
+    print_cache_stats()
+    return exit_code
+
+
+def merge_results(partial_files: List[Path], title: str = None, fix_hint: bool = False,
+                  timings_file: Optional[Path] = None) -> int:
+    """合并各分片的部分结果，输出与单节点运行相同的总结和退出码"""
+    partials = []
+    for partial_file in partial_files:
+        with open(partial_file, 'r', encoding='utf-8') as f:
+            partials.append(json.load(f))
+
+    if not partials:
+        print("错误: 没有可合并的部分结果")
+        return 2
+    counts = {partial['shards'] for partial in partials}
+    totals = {partial['total_files'] for partial in partials}
+    modes = {partial['dry_run'] for partial in partials}
+    digests = {partial.get('timings_digest') for partial in partials}
+    if any(partial.get('version') != RESULT_VERSION for partial in partials) or len(counts) != 1 \
+            or len(totals) != 1 or len(modes) != 1 or len(digests) != 1:
+        print("错误: 部分结果来自不同的运行（分片数、文件数、模式或耗时记录不一致）")
+        return 2
+
+    count = counts.pop()
+    present = sorted(partial['shard'] for partial in partials)
+    if present != list(range(1, count + 1)):
+        missing = sorted(set(range(1, count + 1)) - set(present))
+        print(f"错误: 分片不完整，缺少 {missing}，重复 {sorted({i for i in present if present.count(i) > 1})}")
+        return 2
+
+    records = [record for partial in partials for record in partial['files']]
+    total_files = totals.pop()
+    if len(records) != total_files or len({record['path'] for record in records}) != total_files:
+        print(f"错误: 合并后文件数 {len(records)} 与预期 {total_files} 不一致")
+        return 2
+
+    print(f"合并 {count} 个分片的结果")
+    if timings_file:
+        save_timings(timings_file, records)
+    return print_summary(records, modes.pop(), title, fix_hint)
+
+
+def add_shard_arguments(parser):
+    """为批量脚本添加分片相关参数"""
+    parser.add_argument('--shard', help='只处理第i个分片（共N个），格式 i/N，如 1/4')
+    parser.add_argument('--partial-output', help=f'分片部分结果文件 (默认: {DEFAULT_SHARD_DIR}/shard-i-of-N.json)')
+    parser.add_argument('--merge', nargs='+', metavar='RESULT', help='合并各分片的部分结果并输出总结')
+    parser.add_argument('--timings',
+                        help=f'历史耗时文件，用于均衡分片；普通运行只在指定时才记录耗时 '
+                             f'(分片/合并时默认: {DEFAULT_TIMINGS_FILE})')
+
+
+def timings_path(args) -> Optional[Path]:
+    """耗时记录文件: 显式指定时使用；分片和合并默认使用共享文件；普通检查不写任何缓存"""
+    if args.timings:
+        return Path(args.timings)
+    if args.shard or args.merge:
+        return Path(DEFAULT_TIMINGS_FILE)
+    return None
@@ -0,0 +1,203 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+文档引用关系工具
+解析Markdown中的本地链接目标，支持移动文件时同步改写引用，以及资源文件的孤立/缺失检查
+"""
+
+import os
+import re
+import shutil
+from pathlib import Path
+from urllib.parse import quote, unquote
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from link_validator import extract_links
+from link_batch import find_markdown_files, display_path
+from rewrite_engine import RewriteSession
+
+SCHEME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+# 链接后的可选标题，如 [text](./a.md "标题")
+TITLE_PATTERN = re.compile(r'''\s+(?:"[^"]*"|'[^']*'|\([^)]*\))\s*$''')
+
+
+def split_link(link: str) -> Tuple[str, str]:
+    """拆分为(路径, 锚点或查询串)"""
+    for separator in ('#', '?'):
+        if separator in link:
+            index = link.index(separator)
+            return link[:index], link[index:]
+    return link, ''
+
+
+def link_url(link: str) -> Tuple[str, int]:
+    """去掉链接标题和两侧空白，返回(地址, 地址在原链接中的偏移)"""
+    stripped = TITLE_PATTERN.sub('', link).rstrip()
+    offset = len(stripped) - len(stripped.lstrip())
+    return stripped.strip(), offset
+
+
+def is_local_link(url: str) -> bool:
+    return bool(url) and not url.startswith('#') and not url.startswith('//') and not SCHEME_PATTERN.match(url)
+
+
+def resolve_link(url: str, source_dir: Path, docs_root: Path) -> Optional[Path]:
+    """将本地链接解析为文件路径（兼容VitePress省略.md和目录index.md的写法），外部链接返回None"""
+    path, _ = split_link(url)
+    if not is_local_link(path):
+        return None
+    path = unquote(path)
+    if path.startswith('/docs/'):
+        bases = [docs_root / path[len('/docs/'):]]
+    elif path.startswith('/'):
+        bases = [docs_root / path[1:], docs_root / 'public' / path[1:]]
+    else:
+        bases = [source_dir / path]
+
+    candidates = []
+    for base in bases:
+        base = Path(os.path.normpath(base))
+        candidates.append(base)
+        if not base.suffix:
+            candidates.append(base.with_name(base.name + '.md'))
+        candidates.append(base / 'index.md')
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate
+    return candidates[0]
+
+
+def format_link(original: str, target: Path, source_dir: Path, docs_root: Path) -> str:
+    """按原链接的写法（绝对/相对、是否带./、是否省略.md）生成指向新目标的链接"""
+    path, suffix = split_link(original)
+    if path.startswith('/'):
+        public_root = docs_root / 'public'
+        if not path.startswith('/docs/') and public_root in target.parents:
+            new_path = '/' + target.relative_to(public_root).as_posix()
+        else:
+            prefix = '/docs/' if path.startswith('/docs/') else '/'
+            new_path = prefix + target.relative_to(docs_root).as_posix()
+    else:
+        new_path = os.path.relpath(target, source_dir).replace('\\', '/')
+        if path.startswith('./') and not new_path.startswith('../'):
+            new_path = './' + new_path
+
+    if target.suffix == '.md' and not Path(unquote(path)).suffix:
+        new_path = new_path[:-len('.md')]
+        if target.name == 'index.md' and (path.endswith('/') or path in ('.', './', '/')):
+            new_path = new_path[:-len('index')] or './'
+
+    if '%' in path:
+        new_path = quote(new_path, safe="/.-_~")
+    return new_path + suffix
+
+
+def collect_references(markdown_files: List[Path], docs_root: Path) -> Dict[Path, List[Tuple[Path, str]]]:
+    """收集所有本地链接，返回{目标路径: [(引用文件, 原始链接), ...]}"""
+    references = defaultdict(list)
+    for md_file in markdown_files:
+        content = md_file.read_text(encoding='utf-8')
+        seen = set()
+        for _, _, link, start, _ in extract_links(content, include_html=True):
+            if start in seen:
+                continue
+            seen.add(start)
+            url, _ = link_url(link)
+            target = resolve_link(url, md_file.parent, docs_root)
+            if target is not None:
+                references[target].append((md_file, url))
+    return references
+
+
+def rewrite_links(content: str, source_dir: Path, new_source_dir: Path, docs_root: Path,
+                  mapping: Dict[Path, Path], rebase: bool = False) -> Tuple[str, List[Tuple[str, str]]]:
+    """改写指向mapping中旧路径的链接；rebase为True时（文件本身被移动）同时重算其余相对链接"""
+    edits = {}
+    for _, _, link, start, _ in extract_links(content, include_html=True):
+        url, offset = link_url(link)
+        target = resolve_link(url, source_dir, docs_root)
+        if target is None:
+            continue
+        if target in mapping:
+            new_url = format_link(url, mapping[target], new_source_dir, docs_root)
+        elif rebase and not url.startswith('/') and target.exists():
+            new_url = format_link(url, target, new_source_dir, docs_root)
+        else:
+            continue
+        if new_url != url:
+            edits[start + offset] = (url, new_url)
+
+    changes = []
+    for start in sorted(edits, reverse=True):
+        url, new_url = edits[start]
+        content = content[:start] + new_url + content[start + len(url):]
+        changes.append((url, new_url))
+    changes.reverse()
+    return content, changes
+
+
+def move_file(source: Path, destination: Path, project_root: Path, docs_root: Path,
+              dry_run: bool = False) -> int:
+    """移动文件并改写所有引用它的链接，返回改写的链接数"""
+    source = Path(os.path.abspath(source))
+    destination = Path(os.path.abspath(destination))
+    docs_root = Path(os.path.abspath(docs_root))
+    if destination.is_dir():
+        destination = destination / source.name
+    if not source.is_file():
+        raise FileNotFoundError(f"源文件不存在: {source}")
+    if destination.exists():
+        raise FileExistsError(f"目标已存在: {destination}")
+
+    mapping = {source: destination}
+    total = 0
+    markdown_files = [Path(os.path.abspath(f)) for f in find_markdown_files(docs_root, project_root)]
+    if source.suffix == '.md' and source not in markdown_files:
+        markdown_files.append(source)
+
+    # 先在原位置暂存并提交所有改写（被移动的文件按新目录重算相对链接），再移动文件
+    with RewriteSession(project_root, dry_run=dry_run) as session:
+        for md_file in markdown_files:
+            moved = md_file == source
+            new_dir = destination.parent if moved else md_file.parent
+            content = session.read(md_file)
+            new_content, changes = rewrite_links(content, md_file.parent, new_dir, docs_root, mapping, rebase=moved)
+            if not changes:
+                continue
+            total += len(changes)
+            session.stage(md_file, content, new_content)
+            for old_url, new_url in changes:
+                print(f"  {display_path(md_file, project_root)}: {old_url} -> {new_url}")
+
+    print(f"{'将移动' if dry_run else '移动'}: {display_path(source, project_root)} -> "
+          f"{display_path(destination, project_root)}，改写 {total} 个链接")
+    if dry_run:
+        return total
+
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(source), str(destination))
+    return total
+
+
+def find_asset_files(docs_root: Path, project_root: Path) -> List[Path]:
+    """文档目录下的所有非Markdown资源文件"""
+    from ignore_rules import get_matcher
+    assets = []
+    for root, dirs, files in get_matcher(project_root).walk(docs_root):
+        dirs[:] = [d for d in dirs if not d.startswith('.')]
+        for name in files:
+            if not name.endswith('.md') and not name.startswith('.'):
+                assets.append(Path(os.path.abspath(Path(root) / name)))
+    return assets
+
+
+def check_assets(docs_root: Path, project_root: Path) -> Tuple[List[Path], Dict[Path, List[Tuple[Path, str]]]]:
+    """返回(未被引用的资源文件, {缺失的资源路径: [(引用文件, 原始链接), ...]})"""
+    docs_root = Path(os.path.abspath(docs_root))
+    markdown_files = [Path(os.path.abspath(f)) for f in find_markdown_files(docs_root, project_root)]
+    references = collect_references(markdown_files, docs_root)
+    orphans = [asset for asset in find_asset_files(docs_root, project_root) if asset not in references]
+    missing = {target: refs for target, refs in references.items()
+               if target.suffix and target.suffix != '.md' and not target.exists()}
+    return sorted(orphans), missing
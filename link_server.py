@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+编辑器链接校验服务（LSP，基于stdio的JSON-RPC）
+常驻内存保存项目文件索引、标题锚点和链接关系，文档每次修改只需在内存中重新校验，
+为 Obsidian / VS Code 等编辑器提供链接诊断和 ./data/images/... 相对路径补全
+
+VS Code 等客户端配置命令: python link_server.py [--root 项目目录]
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import argparse
+import unicodedata
+from pathlib import Path
+from collections import defaultdict
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+from typing import Dict, List, Optional, Set, Tuple
+
+from link_validator import extract_links
+from ignore_rules import get_matcher
+
+HEADING_PATTERN = re.compile(r'^#{1,6}\s+(.+?)\s*#*\s*$', re.MULTILINE)
+FENCE_PATTERN = re.compile(r'^```.*?^```', re.MULTILINE | re.DOTALL)
+SCHEME_PATTERN = re.compile(r'^[a-zA-Z][a-zA-Z0-9+.-]*:')
+
+# 光标前正在输入的链接路径：](./data/  或  src="./data/
+COMPLETION_CONTEXT = re.compile(r'''(?:\]\(|\b(?:src|href)=["'])([^)"'\s]*)$''')
+
+# LSP常量
+SEVERITY_ERROR = 1
+SEVERITY_WARNING = 2
+COMPLETION_FILE = 17
+COMPLETION_FOLDER = 19
+COMPLETION_REFERENCE = 18
+
+# 与 VitePress 默认的 slugify 保持一致
+SLUG_CONTROL = re.compile(r'[\u0000-\u001f]')
+SLUG_SPECIAL = re.compile(r'''[\s~`!@#$%^&*()\-_+=\[\]{}|\\;:"'“”‘’<>,.?/]+''')
+SLUG_COMBINING = re.compile(r'[\u0300-\u036f]')
+
+
+def slugify(text: str) -> str:
+    """生成标题锚点"""
+    text = unicodedata.normalize('NFKD', text)
+    text = SLUG_COMBINING.sub('', text)
+    text = SLUG_CONTROL.sub('', text)
+    text = SLUG_SPECIAL.sub('-', text)
+    text = re.sub(r'-{2,}', '-', text).strip('-')
+    text = re.sub(r'^(\d)', r'_\1', text)
+    return text.lower()
+
+
+def heading_slugs(content: str) -> Set[str]:
+    """文档中所有标题的锚点（忽略代码块中的#）"""
+    content = FENCE_PATTERN.sub('', content)
+    slugs = set()
+    for match in HEADING_PATTERN.finditer(content):
+        slug = slugify(match.group(1))
+        # 重复标题会被追加 -1、-2 后缀
+        unique, index = slug, 1
+        while unique in slugs:
+            unique = f"{slug}-{index}"
+            index += 1
+        slugs.add(unique)
+    return slugs
+
+
+def uri_to_path(uri: str) -> Path:
+    parsed = urlparse(uri)
+    return Path(url2pathname(unquote(parsed.path)))
+
+
+class LineIndex:
+    """字符偏移与LSP位置（行，UTF-16列）之间的转换"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.starts = [0]
+        for match in re.finditer('\n', text):
+            self.starts.append(match.end())
+
+    def position(self, offset: int) -> dict:
+        line = self._line_of(offset)
+        column_text = self.text[self.starts[line]:offset]
+        return {'line': line, 'character': len(column_text.encode('utf-16-le')) // 2}
+
+    def offset(self, position: dict) -> int:
+        line = min(position['line'], len(self.starts) - 1)
+        start = self.starts[line]
+        end = self.starts[line + 1] - 1 if line + 1 < len(self.starts) else len(self.text)
+        units = position['character']
+        offset = start
+        while offset < end and units > 0:
+            units -= 2 if ord(self.text[offset]) > 0xFFFF else 1
+            offset += 1
+        return offset
+
+    def _line_of(self, offset: int) -> int:
+        low, high = 0, len(self.starts) - 1
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.starts[middle] <= offset:
+                low = middle
+            else:
+                high = middle - 1
+        return low
+
+
+class WorkspaceIndex:
+    """项目文件、目录和标题锚点的内存索引"""
+
+    def __init__(self, root: Path):
+        self.root = root.resolve()
+        self.files: Set[str] = set()
+        self.children: Dict[str, Set[Tuple[str, bool]]] = defaultdict(set)
+        self._slugs: Dict[str, Tuple[float, Set[str]]] = {}
+        self.rebuild()
+
+    def rebuild(self):
+        self.files.clear()
+        self.children.clear()
+        matcher = get_matcher(self.root)
+        for root, dirs, files in matcher.walk(self.root):
+            rel_root = matcher.relative(root)
+            for d in dirs:
+                self.children[rel_root].add((d, True))
+            for f in files:
+                self.add_file(f"{rel_root}/{f}" if rel_root else f)
+
+    def add_file(self, rel_path: str):
+        if rel_path in self.files:
+            return
+        self.files.add(rel_path)
+        parts = rel_path.split('/')
+        for i in range(len(parts)):
+            parent = '/'.join(parts[:i])
+            self.children[parent].add((parts[i], i < len(parts) - 1))
+
+    def remove_file(self, rel_path: str):
+        self.files.discard(rel_path)
+        self._slugs.pop(rel_path, None)
+        parent, _, name = rel_path.rpartition('/')
+        self.children[parent].discard((name, False))
+
+    def is_dir(self, rel_path: str) -> bool:
+        return rel_path == '' or rel_path in self.children
+
+    def relative(self, path: Path) -> Optional[str]:
+        try:
+            return path.resolve().relative_to(self.root).as_posix()
+        except ValueError:
+            return None
+
+    def slugs(self, rel_path: str) -> Set[str]:
+        """读取Markdown文件的标题锚点，按修改时间缓存"""
+        full_path = self.root / rel_path
+        try:
+            mtime = full_path.stat().st_mtime
+        except OSError:
+            return set()
+        cached = self._slugs.get(rel_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        slugs = heading_slugs(full_path.read_text(encoding='utf-8'))
+        self._slugs[rel_path] = (mtime, slugs)
+        return slugs
+
+    def invalidate(self, rel_path: str):
+        self._slugs.pop(rel_path, None)
+
+
+class LinkServer:
+    """LSP服务：文档同步、链接诊断、路径补全"""
+
+    def __init__(self, root: Path, stdin=None, stdout=None, verbose: bool = False):
+        self.stdin = stdin or sys.stdin.buffer
+        self.stdout = stdout or sys.stdout.buffer
+        self.verbose = verbose
+        self.root = root
+        self.index: Optional[WorkspaceIndex] = None
+        self.documents: Dict[str, str] = {}
+        # 链接关系: 文档 -> 目标文件，目标文件 -> 引用它的文档
+        self.links_from: Dict[str, Set[str]] = defaultdict(set)
+        self.links_to: Dict[str, Set[str]] = defaultdict(set)
+        self.shutdown_requested = False
+
+    # ---------- JSON-RPC ----------
+
+    def read_message(self) -> Optional[dict]:
+        length = None
+        while True:
+            line = self.stdin.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode('ascii').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value.strip())
+        if length is None:
+            return None
+        return json.loads(self.stdin.read(length).decode('utf-8'))
+
+    def send(self, message: dict):
+        message['jsonrpc'] = '2.0'
+        body = json.dumps(message, ensure_ascii=False).encode('utf-8')
+        self.stdout.write(f"Content-Length: {len(body)}\r\n\r\n".encode('ascii') + body)
+        self.stdout.flush()
+
+    def log(self, text: str):
+        if self.verbose:
+            print(text, file=sys.stderr, flush=True)
+
+    def serve(self) -> int:
+        while True:
+            message = self.read_message()
+            if message is None:
+                return 0 if self.shutdown_requested else 1
+            method = message.get('method')
+            if method == 'exit':
+                return 0 if self.shutdown_requested else 1
+            start = time.perf_counter()
+            try:
+                result = self.dispatch(method, message.get('params') or {})
+                if 'id' in message:
+                    self.send({'id': message['id'], 'result': result})
+            except Exception as e:
+                if 'id' in message:
+                    self.send({'id': message['id'], 'error': {'code': -32603, 'message': str(e)}})
+                self.log(f"{method} 出错: {e}")
+            self.log(f"{method}: {(time.perf_counter() - start) * 1000:.2f} ms")
+
+    def dispatch(self, method: str, params: dict):
+        handler = {
+            'initialize': self.on_initialize,
+            'initialized': lambda params: None,
+            'shutdown': self.on_shutdown,
+            'textDocument/didOpen': self.on_did_open,
+            'textDocument/didChange': self.on_did_change,
+            'textDocument/didSave': self.on_did_save,
+            'textDocument/didClose': self.on_did_close,
+            'textDocument/completion': self.on_completion,
+            'workspace/didChangeWatchedFiles': self.on_watched_files,
+        }.get(method)
+        if handler is None:
+            if method and not method.startswith('$/'):
+                raise ValueError(f"不支持的方法: {method}")
+            return None
+        return handler(params)
+
+    # ---------- 生命周期 ----------
+
+    def on_initialize(self, params: dict) -> dict:
+        root_uri = params.get('rootUri')
+        if root_uri:
+            self.root = uri_to_path(root_uri)
+        elif params.get('rootPath'):
+            self.root = Path(params['rootPath'])
+        self.index = WorkspaceIndex(self.root)
+        self.log(f"索引 {len(self.index.files)} 个文件: {self.index.root}")
+        return {
+            'capabilities': {
+                'textDocumentSync': {'openClose': True, 'change': 1, 'save': {'includeText': False}},
+                'completionProvider': {'triggerCharacters': ['/', '#', '(', '"', "'"]},
+            },
+            'serverInfo': {'name': 'doc-link-server', 'version': '1.0'},
+        }
+
+    def on_shutdown(self, params: dict):
+        self.shutdown_requested = True
+        return None
+
+    # ---------- 文档同步 ----------
+
+    def on_did_open(self, params: dict):
+        document = params['textDocument']
+        self.documents[document['uri']] = document['text']
+        self.publish_diagnostics(document['uri'])
+
+    def on_did_change(self, params: dict):
+        uri = params['textDocument']['uri']
+        changes = params.get('contentChanges') or []
+        if changes:
+            self.documents[uri] = changes[-1]['text']
+        self.publish_diagnostics(uri)
+        self.refresh_dependents(uri)
+
+    def on_did_save(self, params: dict):
+        uri = params['textDocument']['uri']
+        rel_path = self.index.relative(uri_to_path(uri))
+        if rel_path:
+            self.index.add_file(rel_path)
+            self.index.invalidate(rel_path)
+
+    def on_did_close(self, params: dict):
+        uri = params['textDocument']['uri']
+        self.documents.pop(uri, None)
+        self.send({'method': 'textDocument/publishDiagnostics', 'params': {'uri': uri, 'diagnostics': []}})
+
+    def on_watched_files(self, params: dict):
+        affected = set()
+        for change in params.get('changes', []):
+            rel_path = self.index.relative(uri_to_path(change['uri']))
+            if rel_path is None:
+                continue
+            # 1=创建 2=修改 3=删除
+            if change['type'] == 3:
+                self.index.remove_file(rel_path)
+            else:
+                self.index.add_file(rel_path)
+                self.index.invalidate(rel_path)
+            affected.update(self.links_to.get(rel_path, ()))
+            affected.add(rel_path)
+        for uri in list(self.documents):
+            rel_path = self.index.relative(uri_to_path(uri))
+            if rel_path in affected or any(t in affected for t in self.links_from.get(rel_path, ())):
+                self.publish_diagnostics(uri)
+
+    def refresh_dependents(self, uri: str):
+        """被修改文档的标题可能变化，重新校验引用它的其他已打开文档"""
+        rel_path = self.index.relative(uri_to_path(uri))
+        for other_uri in list(self.documents):
+            if other_uri == uri:
+                continue
+            other_rel = self.index.relative(uri_to_path(other_uri))
+            if rel_path in self.links_from.get(other_rel, ()):
+                self.publish_diagnostics(other_uri)
+
+    # ---------- 诊断 ----------
+
+    def document_slugs(self, rel_path: str) -> Set[str]:
+        """已打开文档使用编辑器中的内容，否则读取磁盘"""
+        for uri, text in self.documents.items():
+            if self.index.relative(uri_to_path(uri)) == rel_path:
+                return heading_slugs(text)
+        return self.index.slugs(rel_path)
+
+    def resolve(self, doc_rel: str, link: str) -> Tuple[Optional[str], str]:
+        """将链接解析为项目内相对路径，返回(目标路径, 锚点)，无法解析时目标为None"""
+        path, _, anchor = link.partition('#')
+        path = unquote(path.split('?', 1)[0].strip())
+        doc_dir = doc_rel.rpartition('/')[0]
+        if not path:
+            return doc_rel, anchor
+        if path.startswith('/'):
+            # VitePress路由，相对于docs目录
+            path = path[1:]
+            if path.startswith('docs/'):
+                path = path[5:]
+            base = 'docs' if self.index.is_dir('docs') else ''
+            candidate = f"{base}/{path}" if base else path
+        else:
+            candidate = f"{doc_dir}/{path}" if doc_dir else path
+        candidate = os.path.normpath(candidate).replace(os.sep, '/')
+        if candidate.startswith('..'):
+            return None, anchor
+        if candidate == '.':
+            candidate = ''
+
+        if candidate in self.index.files:
+            return candidate, anchor
+        if self.index.is_dir(candidate):
+            index_file = f"{candidate}/index.md" if candidate else 'index.md'
+            return (index_file if index_file in self.index.files else candidate), anchor
+        if f"{candidate}.md" in self.index.files:
+            return f"{candidate}.md", anchor
+        return None, anchor
+
+    def diagnose(self, uri: str) -> List[dict]:
+        text = self.documents.get(uri, '')
+        doc_rel = self.index.relative(uri_to_path(uri)) or ''
+        lines = LineIndex(text)
+        diagnostics = []
+        targets = set()
+        seen_spans = set()
+
+        for link_type, _, link, start, end in extract_links(text, include_html=True):
+            if (start, end) in seen_spans:
+                continue
+            seen_spans.add((start, end))
+            link = link.strip()
+            if not link or link.startswith('//') or SCHEME_PATTERN.match(link):
+                continue
+            target, anchor = self.resolve(doc_rel, link)
+            span = {'start': lines.position(start), 'end': lines.position(end)}
+            if target is None:
+                diagnostics.append({
+                    'range': span,
+                    'severity': SEVERITY_ERROR,
+                    'source': 'doc-links',
+                    'message': f"找不到文件: {link.split('#')[0]}",
+                })
+                continue
+            targets.add(target)
+            if anchor and target.endswith('.md'):
+                slugs = heading_slugs(text) if target == doc_rel else self.document_slugs(target)
+                if unquote(anchor) not in slugs:
+                    diagnostics.append({
+                        'range': span,
+                        'severity': SEVERITY_WARNING,
+                        'source': 'doc-links',
+                        'message': f"找不到锚点: #{anchor}",
+                    })
+
+        for old_target in self.links_from.get(doc_rel, ()):
+            self.links_to[old_target].discard(doc_rel)
+        self.links_from[doc_rel] = targets
+        for target in targets:
+            self.links_to[target].add(doc_rel)
+        return diagnostics
+
+    def publish_diagnostics(self, uri: str):
+        self.send({
+            'method': 'textDocument/publishDiagnostics',
+            'params': {'uri': uri, 'diagnostics': self.diagnose(uri)},
+        })
+
+    # ---------- 补全 ----------
+
+    def on_completion(self, params: dict) -> dict:
+        uri = params['textDocument']['uri']
+        text = self.documents.get(uri, '')
+        lines = LineIndex(text)
+        offset = lines.offset(params['position'])
+        line_start = text.rfind('\n', 0, offset) + 1
+        match = COMPLETION_CONTEXT.search(text[line_start:offset])
+        if not match:
+            return {'isIncomplete': False, 'items': []}
+
+        typed = match.group(1)
+        doc_rel = self.index.relative(uri_to_path(uri)) or ''
+        replace_start = offset - len(typed)
+
+        if '#' in typed:
+            # 锚点补全
+            path_part, _, partial = typed.partition('#')
+            target, _ = self.resolve(doc_rel, path_part) if path_part else (doc_rel, '')
+            if not target or not target.endswith('.md'):
+                return {'isIncomplete': False, 'items': []}
+            slugs = heading_slugs(text) if target == doc_rel else self.document_slugs(target)
+            edit_start = lines.position(offset - len(partial))
+            return {'isIncomplete': False, 'items': [
+                {'label': slug, 'kind': COMPLETION_REFERENCE,
+                 'textEdit': {'range': {'start': edit_start, 'end': lines.position(offset)}, 'newText': slug}}
+                for slug in sorted(slugs) if slug.startswith(partial)
+            ]}
+
+        if not typed.startswith(('.', '/')) and typed:
+            return {'isIncomplete': False, 'items': []}
+
+        directory, _, partial = typed.rpartition('/')
+        if not typed.startswith('/') and not directory:
+            directory = '.'
+        target, _ = self.resolve(doc_rel, (directory or '/') + '/')
+        dir_rel = target[:-len('/index.md')] if target and target.endswith('/index.md') else target
+        if dir_rel == 'index.md':
+            dir_rel = ''
+        if dir_rel is None or not self.index.is_dir(dir_rel):
+            return {'isIncomplete': False, 'items': []}
+
+        edit_range = {'start': lines.position(replace_start + len(typed) - len(partial)), 'end': lines.position(offset)}
+        items = []
+        for name, is_dir in sorted(self.index.children.get(dir_rel, ()), key=lambda c: (not c[1], c[0])):
+            if not name.startswith(partial):
+                continue
+            new_text = name + '/' if is_dir else name
+            items.append({
+                'label': new_text,
+                'kind': COMPLETION_FOLDER if is_dir else COMPLETION_FILE,
+                'textEdit': {'range': edit_range, 'newText': new_text},
+            })
+        return {'isIncomplete': False, 'items': items}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='编辑器链接校验服务（LSP over stdio）')
+    parser.add_argument('--root', default='.', help='项目根目录 (默认: 当前目录，客户端提供rootUri时以其为准)')
+    parser.add_argument('--verbose', '-v', action='store_true', help='在stderr输出每个请求的耗时')
+
+    args = parser.parse_args()
+
+    server = LinkServer(Path(args.root), verbose=args.verbose)
+    return server.serve()
+
+
+if __name__ == '__main__':
+    sys.exit(main())
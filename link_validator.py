@@ -8,32 +8,109 @@
 import os
 import re
 import sys
-import os
-import argparse
 from pathlib import Path
+from contextlib import contextmanager
+from collections import OrderedDict
 from urllib.parse import urlparse
-import requests
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Optional
+from path_suggest import TrigramIndex
+from ignore_rules import get_matcher
+from rewrite_engine import Patch, RewriteSession, apply_patches, add_diff_arguments, diff_destination
+
+# Markdown链接正则表达式
+LINK_PATTERNS = [
+    # [text](url) - 普通链接
+    (r'\[([^\]]+)\]\(([^\)]+)\)', 'link'),
+    # ![alt](url) - 图片链接
+    (r'!\[([^\]]*)\]\(([^\)]+)\)', 'image'),
+    # [text]: url - 参考链接
+    (r'^\s*\[([^\]]+)\]:\s*(.+)$', 'reference')
+]
+
+# 内嵌HTML中的链接，如 <source src="./data/mp3/...">
+HTML_LINK_PATTERN = (r'<[a-zA-Z][^>]*?\s(href|src)=["\']([^"\']+)["\']', 'html')
+
+def extract_links(content: str, patterns: List[Tuple[str, str]] = None,
+                  include_html: bool = False) -> List[Tuple[str, str, str, int, int]]:
+    """提取文档中的所有链接，返回[(类型, 文本, 链接, 链接起始偏移, 链接结束偏移), ...]"""
+    patterns = list(patterns or LINK_PATTERNS)
+    if include_html:
+        patterns.append(HTML_LINK_PATTERN)
+    links = []
+    for pattern, link_type in patterns:
+        for match in re.finditer(pattern, content, flags=re.MULTILINE):
+            links.append((link_type, match.group(1), match.group(2), match.start(2), match.end(2)))
+    return links
 
 class LinkValidator:
-    def __init__(self, target_file: str, dry_run: bool = False):
+    # 按项目根目录缓存的文件名三元组索引，同一次运行中所有实例共享
+    _suggest_indexes: Dict[Path, TrigramIndex] = {}
+
+    # 以下缓存只在 shared_caches() 范围内（一次批量运行）启用，所有实例共享；
+    # 范围外每次都重新访问文件系统，长期运行的进程不会拿到过期结果
+    _caching = False
+
+    # 链接解析缓存（LRU）: (基准目录, 链接, 自动修复阈值) -> (修复后的链接, 解析时输出的信息, 损坏链接数)
+    RESOLVE_CACHE_SIZE = 4096
+    _resolve_cache: 'OrderedDict[Tuple[str, str, Optional[float]], Tuple[str, Tuple[str, ...], int]]' = OrderedDict()
+
+    # 按基准目录缓存向上查找得到的docs目录和项目根目录
+    _root_cache: Dict[Tuple[str, str], Path] = {}
+
+    _cache_stats = {'resolve_hits': 0, 'resolve_misses': 0}
+
+    def __init__(self, target_file: str, dry_run: bool = False, auto_fix_threshold: Optional[float] = None,
+                 writer: Optional[RewriteSession] = None):
         self.target_file = Path(target_file)
         self.dry_run = dry_run
+        self.auto_fix_threshold = auto_fix_threshold
+        # 批量运行时由调用方提供，统一落盘和生成diff；单独使用时每个文件立即原子写入
+        self.writer = writer
         self.base_dir = self.target_file.parent
         self.fixes_count = 0
         self.total_links = 0
         self.broken_links = 0
         self.url_links = 0
+        self._base_key = os.path.abspath(self.base_dir)
+        self._messages = None
         
         # Markdown链接正则表达式
-        self.link_patterns = [
-            # [text](url) - 普通链接
-            (r'\[([^\]]+)\]\(([^\)]+)\)', 'link'),
-            # ![alt](url) - 图片链接
-            (r'!\[([^\]]*)\]\(([^\)]+)\)', 'image'),
-            # [text]: url - 参考链接
-            (r'^\s*\[([^\]]+)\]:\s*(.+)$', 'reference')
-        ]
+        self.link_patterns = list(LINK_PATTERNS)
+    
+    @classmethod
+    def clear_caches(cls):
+        """清空所有实例共享的解析缓存和统计"""
+        cls._resolve_cache.clear()
+        cls._root_cache.clear()
+        for key in cls._cache_stats:
+            cls._cache_stats[key] = 0
+    
+    @classmethod
+    @contextmanager
+    def shared_caches(cls):
+        """在一次批量运行期间启用共享缓存，结束后丢弃缓存内容（统计保留供输出）"""
+        cls.clear_caches()
+        cls._caching = True
+        try:
+            yield
+        finally:
+            cls._caching = False
+            cls._resolve_cache.clear()
+            cls._root_cache.clear()
+    
+    @classmethod
+    def cache_stats(cls) -> Dict[str, int]:
+        return dict(cls._cache_stats)
+    
+    def log(self, message: str):
+        """输出信息，解析链接期间同时记录下来供缓存命中时重放"""
+        print(message)
+        if self._messages is not None:
+            self._messages.append(message)
+    
+    def extract_links(self, content: str, include_html: bool = False) -> List[Tuple[str, str, str, int, int]]:
+        """提取文档中的所有链接及其偏移"""
+        return extract_links(content, self.link_patterns, include_html)
     
     def is_url(self, link: str) -> bool:
         """检查是否为URL"""
@@ -42,17 +119,21 @@ class LinkValidator:
     
     def is_valid_url(self, url: str) -> bool:
         """验证URL是否可访问"""
+        # requests 导入开销较大，只在真正需要访问网络时加载
+        import requests
         try:
             response = requests.head(url, timeout=5, allow_redirects=True)
             return response.status_code < 400
         except:
             return False
     
-    def find_file_in_project(self, filename: str) -> List[Path]:
-        """在项目中查找文件"""
-        # 从当前文件目录开始向上查找项目根目录
-        current_dir = self.target_file.parent
-        project_root = current_dir
+    def find_project_root(self) -> Path:
+        """从当前文件目录开始向上查找项目根目录"""
+        key = ('project', self._base_key)
+        if LinkValidator._caching and key in LinkValidator._root_cache:
+            return LinkValidator._root_cache[key]
+        
+        project_root = self.target_file.parent
         
         # 向上查找，直到找到包含.git或package.json的目录，或到达根目录
         while project_root.parent != project_root:
@@ -60,13 +141,44 @@ class LinkValidator:
                 break
             project_root = project_root.parent
         
+        if LinkValidator._caching:
+            LinkValidator._root_cache[key] = project_root
+        return project_root
+    
+    def find_docs_root(self) -> Path:
+        """从当前文件目录开始向上查找docs目录，找不到时返回文件系统根目录"""
+        key = ('docs', self._base_key)
+        if LinkValidator._caching and key in LinkValidator._root_cache:
+            return LinkValidator._root_cache[key]
+        
+        docs_root = self.base_dir
+        while docs_root.name != 'docs' and docs_root.parent != docs_root:
+            docs_root = docs_root.parent
+        
+        if LinkValidator._caching:
+            LinkValidator._root_cache[key] = docs_root
+        return docs_root
+    
+    def find_file_in_project(self, filename: str) -> List[Path]:
+        """在项目中查找文件"""
+        project_root = self.find_project_root()
+        
         matches = []
-        for root, dirs, files in os.walk(project_root):
+        for root, dirs, files in get_matcher(project_root).walk(project_root):
             if filename in files:
                 matches.append(Path(root) / filename)
         
         return matches
     
+    def suggest_paths(self, link: str, near_dir: Path, limit: int = 3) -> List[Tuple[float, Path]]:
+        """按文件名相似度和目录距离推荐候选文件"""
+        project_root = self.find_project_root().resolve()
+        index = LinkValidator._suggest_indexes.get(project_root)
+        if index is None:
+            index = TrigramIndex(project_root)
+            LinkValidator._suggest_indexes[project_root] = index
+        return index.query(link, near_dir=near_dir, limit=limit)
+    
     def get_relative_path(self, target_path: Path) -> str:
         """获取相对路径"""
         try:
@@ -75,7 +187,35 @@ class LinkValidator:
             return str(target_path).replace('\\', '/')
     
     def fix_local_link(self, link: str) -> str:
-        """修复本地链接"""
+        """修复本地链接，批量运行中同一目录下的相同链接只解析一次"""
+        if not LinkValidator._caching:
+            return self.resolve_local_link(link)
+        key = (self._base_key, link, self.auto_fix_threshold)
+        cache = LinkValidator._resolve_cache
+        cached = cache.get(key)
+        if cached is not None:
+            cache.move_to_end(key)
+            LinkValidator._cache_stats['resolve_hits'] += 1
+            fixed_link, messages, broken = cached
+            for message in messages:
+                print(message)
+            self.broken_links += broken
+            return fixed_link
+        
+        LinkValidator._cache_stats['resolve_misses'] += 1
+        self._messages = []
+        broken_before = self.broken_links
+        try:
+            fixed_link = self.resolve_local_link(link)
+            cache[key] = (fixed_link, tuple(self._messages), self.broken_links - broken_before)
+        finally:
+            self._messages = None
+        if len(cache) > LinkValidator.RESOLVE_CACHE_SIZE:
+            cache.popitem(last=False)
+        return fixed_link
+    
+    def resolve_local_link(self, link: str) -> str:
+        """解析并修复单个本地链接（不经过缓存）"""
         # 移除锚点
         clean_link = link.split('#')[0].strip()
         anchor = '#' + link.split('#')[1] if '#' in link else ''
@@ -92,9 +232,7 @@ class LinkValidator:
         if clean_link.startswith('/docs/'):
             # 这是VitePress的路由路径，检查对应的文件系统路径
             vitepress_path = clean_link[1:]  # 移除开头的/
-            docs_root = self.base_dir
-            while docs_root.name != 'docs' and docs_root.parent != docs_root:
-                docs_root = docs_root.parent
+            docs_root = self.find_docs_root()
             if docs_root.name == 'docs':
                 target_path = docs_root / vitepress_path[5:]  # 移除'docs/'
             else:
@@ -114,21 +252,20 @@ class LinkValidator:
                 dirname = Path(clean_link).parts[-1] if Path(clean_link).parts else ''
                 if dirname:
                     # 查找匹配的目录
-                    for root, dirs, files in os.walk(docs_root if docs_root.name == 'docs' else self.base_dir):
+                    search_root = docs_root if docs_root.name == 'docs' else self.base_dir
+                    for root, dirs, files in get_matcher(self.find_project_root()).walk(search_root):
                         if dirname in dirs:
                             found_dir = Path(root) / dirname
                             if (found_dir / 'index.md').exists():
-                                rel_path = found_dir.relative_to(docs_root if docs_root.name == 'docs' else self.base_dir)
+                                rel_path = found_dir.relative_to(search_root)
                                 new_link = f"/docs/{rel_path.as_posix()}/"
-                                print(f"VitePress路径修复: {link} -> {new_link}")
+                                self.log(f"VitePress路径修复: {link} -> {new_link}")
                                 return new_link + anchor
         
         # 处理其他绝对路径（以/开头但不是/docs/）
         elif clean_link.startswith('/'):
             # 转换为相对于docs目录的路径
-            docs_root = self.base_dir
-            while docs_root.name != 'docs' and docs_root.parent != docs_root:
-                docs_root = docs_root.parent
+            docs_root = self.find_docs_root()
             if docs_root.name == 'docs':
                 clean_link = clean_link[1:]  # 移除开头的/
                 target_path = docs_root / clean_link
@@ -147,7 +284,7 @@ class LinkValidator:
             if not new_path.startswith('./'):
                 new_path = './' + new_path
             if new_path != link.split('#')[0]:
-                print(f"路径标准化: {link.split('#')[0]} -> {new_path}")
+                self.log(f"路径标准化: {link.split('#')[0]} -> {new_path}")
                 return new_path + anchor
             return link
         
@@ -165,46 +302,64 @@ class LinkValidator:
                 # 确保使用相对路径格式
                 if not new_path.startswith('./'):
                     new_path = './' + new_path
-                print(f"找到文件匹配: {clean_link} -> {new_path}")
+                self.log(f"找到文件匹配: {clean_link} -> {new_path}")
+                return new_path + anchor
+        
+        # 按文件名相似度查找候选文件
+        suggestions = self.suggest_paths(clean_link, target_path.parent) if filename else []
+        if suggestions and self.auto_fix_threshold is not None:
+            best_score, best_match = suggestions[0]
+            unambiguous = len(suggestions) == 1 or suggestions[1][0] < best_score
+            if best_score >= self.auto_fix_threshold and unambiguous:
+                new_path = self.get_relative_path(best_match)
+                if not new_path.startswith('./'):
+                    new_path = './' + new_path
+                self.log(f"相似文件自动修复 (相似度 {best_score:.2f}): {clean_link} -> {new_path}")
                 return new_path + anchor
         
         # 如果找不到文件，标记为问题链接
         self.broken_links += 1
-        print(f"警告: 找不到文件 {clean_link}")
+        self.log(f"警告: 找不到文件 {clean_link}")
+        for score, candidate in suggestions:
+            suggestion = self.get_relative_path(candidate)
+            if not suggestion.startswith('./'):
+                suggestion = './' + suggestion
+            self.log(f"  建议: {suggestion} (相似度 {score:.2f})")
         return link
     
-    def process_links(self, content: str) -> str:
-        """处理文档中的所有链接"""
-        modified_content = content
-        
-        for pattern, link_type in self.link_patterns:
-            def replace_link(match):
-                text = match.group(1)
-                link = match.group(2)
-                self.total_links += 1
-                
-                # 跳过URL
-                if self.is_url(link):
-                    self.url_links += 1
-                    return match.group(0)
-                
-                # 修复本地链接
-                fixed_link = self.fix_local_link(link)
-                if fixed_link != link:
-                    self.fixes_count += 1
-                    print(f"修复链接: {link} -> {fixed_link}")
-                
-                # 重构链接
-                if link_type == 'image':
-                    return f"![{text}]({fixed_link})"
-                elif link_type == 'reference':
-                    return f"[{text}]: {fixed_link}"
-                else:  # link_type == 'link'
-                    return f"[{text}]({fixed_link})"
+    def collect_patches(self, content: str) -> List[Patch]:
+        """解析文档中的所有链接，返回需要修改的链接的偏移补丁"""
+        # 同一位置可能被多个模式匹配（如图片链接同时匹配普通链接模式），后面的模式接着处理前面修复后的链接
+        current: Dict[Tuple[int, int], str] = {}
+        for _, _, link, start, end in self.extract_links(content):
+            span = (start, end)
+            link = current.get(span, link)
+            self.total_links += 1
+            
+            # 跳过URL
+            if self.is_url(link):
+                self.url_links += 1
+                continue
             
-            modified_content = re.sub(pattern, replace_link, modified_content, flags=re.MULTILINE)
+            # 修复本地链接
+            fixed_link = self.fix_local_link(link)
+            if fixed_link != link:
+                self.fixes_count += 1
+                print(f"修复链接: {link} -> {fixed_link}")
+                current[span] = fixed_link
         
-        return modified_content
+        # 嵌套的匹配（如参考链接的地址里又含有普通链接）只保留先出现的补丁
+        patches = []
+        position = 0
+        for (start, end), fixed_link in sorted(current.items()):
+            if start >= position and fixed_link != content[start:end]:
+                patches.append((start, end, fixed_link))
+                position = end
+        return patches
+    
+    def process_links(self, content: str) -> str:
+        """处理文档中的所有链接"""
+        return apply_patches(content, self.collect_patches(content))
     
     def validate_and_fix(self):
         """验证和修复链接"""
@@ -214,10 +369,18 @@ class LinkValidator:
         
         print(f"处理文件: {self.target_file}")
         
+        # 修改先暂存到改写会话，提交（临时文件 + 原子替换）成功后才算写入
+        session = self.writer
+        if session is None and not self.dry_run:
+            session = RewriteSession(self.find_project_root())
+
         # 读取文件内容
         try:
-            with open(self.target_file, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if session is not None:
+                content = session.read(self.target_file)
+            else:
+                with open(self.target_file, 'r', encoding='utf-8') as f:
+                    content = f.read()
         except Exception as e:
             print(f"错误: 无法读取文件 {e}")
             return False
@@ -225,12 +388,14 @@ class LinkValidator:
         # 处理链接
         modified_content = self.process_links(content)
         
-        # 保存修改
-        if not self.dry_run and modified_content != content:
+        # 保存修改；批量运行时由调用方统一提交
+        if session is not None and modified_content != content:
             try:
-                with open(self.target_file, 'w', encoding='utf-8') as f:
-                    f.write(modified_content)
-                print(f"文件已更新: {self.target_file}")
+                session.stage(self.target_file, content, modified_content)
+                if self.writer is None:
+                    session.commit()
+                    for path in session.updated:
+                        print(f"文件已更新: {path}")
             except Exception as e:
                 print(f"错误: 无法写入文件 {e}")
                 return False
@@ -248,14 +413,23 @@ class LinkValidator:
         return True
 
 def main():
+    import argparse
     parser = argparse.ArgumentParser(description='文档链接验证和修复工具')
     parser.add_argument('file', help='要处理的Markdown文件路径')
     parser.add_argument('--dry-run', action='store_true', help='只检查不修改文件')
+    parser.add_argument('--auto-fix-threshold', type=float, help='相似文件推荐得分不低于该值(0-1)时自动修复链接')
+    add_diff_arguments(parser)
     
     args = parser.parse_args()
     
-    validator = LinkValidator(args.file, args.dry_run)
-    success = validator.validate_and_fix()
+    diff_output = diff_destination(args)
+    with RewriteSession(Path.cwd(), dry_run=args.dry_run, collect_diff=diff_output is not None) as session:
+        validator = LinkValidator(args.file, args.dry_run, args.auto_fix_threshold, writer=session)
+        success = validator.validate_and_fix()
+    for path in session.updated:
+        print(f"文件已更新: {path}")
+    if diff_output is not None:
+        session.write_diff(diff_output)
     
     sys.exit(0 if success else 1)
 
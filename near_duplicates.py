@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+跨分类近似重复诗词检测工具
+对每个页面的原文和赏析做字符shingle，计算MinHash签名，再用LSH分段找出近似重复的页面簇，
+签名按内容哈希缓存，只有新增或修改过的页面才会重新计算
+"""
+
+import re
+import sys
+import json
+import random
+import hashlib
+import argparse
+from pathlib import Path
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Set, Tuple
+
+from poem_page import PoemPage, find_poem_pages
+
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_SIZE = 3
+SEED = 20250830
+MERSENNE_PRIME = (1 << 61) - 1
+MAX_HASH = (1 << 32) - 1
+CACHE_VERSION = 2
+
+# 参与比较的章节
+COMPARED_SECTIONS = ['原文', '赏析']
+
+NON_TEXT_PATTERN = re.compile(r'[^0-9A-Za-z㐀-䶿一-鿿豈-﫿]+')
+
+_rng = random.Random(SEED)
+PERMUTATIONS = [(_rng.randrange(1, MERSENNE_PRIME), _rng.randrange(0, MERSENNE_PRIME)) for _ in range(NUM_PERM)]
+
+
+def page_text(page: PoemPage) -> str:
+    """拼接参与比较的文本（原文 + 赏析）"""
+    parts = [page.original_text]
+    parts.extend(page.sections.get(name, '') for name in COMPARED_SECTIONS[1:])
+    return '\n'.join(parts)
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> Set[int]:
+    """去掉标点空白后按字符切分shingle，返回32位哈希集合"""
+    normalized = NON_TEXT_PATTERN.sub('', text)
+    if len(normalized) < size:
+        grams = {normalized} if normalized else set()
+    else:
+        grams = {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+    return {int.from_bytes(hashlib.blake2b(g.encode('utf-8'), digest_size=4).digest(), 'little') for g in grams}
+
+
+def minhash(text: str) -> List[int]:
+    """计算文本的MinHash签名；没有可比较的文本时返回空签名"""
+    values = shingles(text)
+    if not values:
+        return []
+    return [min((a * v + b) % MERSENNE_PRIME & MAX_HASH for v in values) for a, b in PERMUTATIONS]
+
+
+def estimate_similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """用签名相同位置的比例估计Jaccard相似度"""
+    return sum(1 for x, y in zip(sig_a, sig_b) if x == y) / len(sig_a)
+
+
+def load_cache(cache_file: Path) -> Dict[str, dict]:
+    """读取签名缓存，参数不一致时丢弃"""
+    if not cache_file.exists():
+        return {}
+    try:
+        with open(cache_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    params = data.get('params', {})
+    if params != cache_params():
+        return {}
+    return data.get('pages', {})
+
+
+def save_cache(cache_file: Path, pages: Dict[str, dict]):
+    """保存签名缓存"""
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    with open(cache_file, 'w', encoding='utf-8') as f:
+        json.dump({'params': cache_params(), 'pages': pages}, f, ensure_ascii=False)
+
+
+def cache_params() -> dict:
+    return {
+        'version': CACHE_VERSION,
+        'num_perm': NUM_PERM,
+        'shingle_size': SHINGLE_SIZE,
+        'seed': SEED,
+        'sections': COMPARED_SECTIONS,
+    }
+
+
+def compute_signatures(pages: List[PoemPage], project_root: Path, cache_file: Path,
+                       workers: int = None) -> Tuple[Dict[str, List[int]], int]:
+    """计算所有页面的签名，返回(签名表, 重新计算的页面数)"""
+    cache = load_cache(cache_file)
+    signatures = {}
+    new_cache = {}
+    pending = []
+
+    for page in pages:
+        try:
+            key = page.path.relative_to(project_root).as_posix()
+        except ValueError:
+            key = page.path.as_posix()
+        text = page_text(page)
+        digest = hashlib.sha1(text.encode('utf-8')).hexdigest()
+        cached = cache.get(key)
+        if cached and cached.get('sha1') == digest:
+            signatures[key] = cached['signature']
+            new_cache[key] = cached
+        else:
+            pending.append((key, digest, text))
+
+    if pending:
+        if len(pending) == 1 or workers == 1:
+            results = [minhash(text) for _, _, text in pending]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(minhash, [text for _, _, text in pending], chunksize=8))
+        for (key, digest, _), signature in zip(pending, results):
+            signatures[key] = signature
+            new_cache[key] = {'sha1': digest, 'signature': signature}
+
+    save_cache(cache_file, new_cache)
+    return signatures, len(pending)
+
+
+def find_clusters(signatures: Dict[str, List[int]], threshold: float) -> List[List[Tuple[str, str, float]]]:
+    """LSH分段找候选对，校验相似度后用并查集合并为簇"""
+    rows = NUM_PERM // BANDS
+    buckets = defaultdict(list)
+    for key, signature in signatures.items():
+        for band in range(BANDS):
+            buckets[(band, tuple(signature[band * rows:(band + 1) * rows]))].append(key)
+
+    parent = {key: key for key in signatures}
+
+    def find(key):
+        while parent[key] != key:
+            parent[key] = parent[parent[key]]
+            key = parent[key]
+        return key
+
+    pairs = {}
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                pair = (a, b) if a < b else (b, a)
+                if pair in pairs:
+                    continue
+                similarity = estimate_similarity(signatures[a], signatures[b])
+                pairs[pair] = similarity
+                if similarity >= threshold:
+                    parent[find(a)] = find(b)
+
+    groups = defaultdict(list)
+    for key in signatures:
+        groups[find(key)].append(key)
+
+    clusters = []
+    for members in groups.values():
+        if len(members) < 2:
+            continue
+        members.sort()
+        edges = [(a, b, pairs[(a, b)]) for i, a in enumerate(members) for b in members[i + 1:]
+                 if (a, b) in pairs and pairs[(a, b)] >= threshold]
+        clusters.append(edges)
+    return clusters
+
+
+def main():
+    parser = argparse.ArgumentParser(description='检测跨分类的近似重复诗词页面')
+    parser.add_argument('--docs', default='docs', help='文档目录 (默认: docs)')
+    parser.add_argument('--threshold', type=float, default=0.6, help='判定为近似重复的相似度阈值 (默认: 0.6)')
+    parser.add_argument('--cache', default='.cache/minhash_signatures.json', help='签名缓存文件')
+    parser.add_argument('--workers', type=int, help='计算签名的进程数 (默认: CPU核数)')
+    parser.add_argument('--cross-category-only', action='store_true', help='只报告跨分类的重复')
+
+    args = parser.parse_args()
+
+    project_root = Path.cwd().resolve()
+    docs_dir = Path(args.docs).resolve()
+    if not docs_dir.exists():
+        print(f"错误: 文档目录不存在 {docs_dir}")
+        return 1
+
+    pages = find_poem_pages(docs_dir)
+    print(f"找到 {len(pages)} 个诗词页面")
+
+    signatures, rehashed = compute_signatures(pages, project_root, Path(args.cache), args.workers)
+    print(f"重新计算签名: {rehashed} 个，使用缓存: {len(pages) - rehashed} 个")
+
+    # 没有原文/赏析的页面签名为空，彼此之间没有可比性，不参与分桶，单独列出
+    empty = sorted(key for key, signature in signatures.items() if not signature)
+    clusters = find_clusters({key: signature for key, signature in signatures.items() if signature},
+                             args.threshold)
+    if args.cross_category_only:
+        clusters = [c for c in clusters
+                    if len({Path(p).parent.name for a, b, _ in c for p in (a, b)}) > 1]
+
+    print(f"\n=== 近似重复检测结果 ===")
+    print(f"相似度阈值: {args.threshold}")
+    print(f"重复簇数: {len(clusters)}")
+
+    for index, edges in enumerate(clusters, 1):
+        print(f"\n簇 {index}:")
+        for a, b, similarity in edges:
+            print(f"  {a} <-> {b}: 相似度 {similarity:.2f}")
+
+    if empty:
+        print(f"\n没有可比较文本（原文/赏析）的页面: {len(empty)}")
+        for key in empty:
+            print(f"  {key}")
+
+    if not clusters:
+        print("\n✅ 没有发现近似重复的页面!")
+
+    return 0 if not clusters else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+基于三元组（trigram）索引的路径模糊匹配
+为找不到目标文件的链接推荐最相近的项目文件，按文件名相似度和目录距离排序
+"""
+
+import math
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from ignore_rules import get_matcher
+
+# 文件名相似度与目录距离在总分中的占比
+NAME_WEIGHT = 0.8
+PROXIMITY_WEIGHT = 0.2
+# 扩展名不一致时的扣分
+SUFFIX_PENALTY = 0.1
+
+
+def trigrams(name: str) -> List[str]:
+    """文件名的三元组，首尾补边界符以区分开头和结尾"""
+    padded = f"\x00{name.lower()}\x00"
+    return [padded[i:i + 3] for i in range(len(padded) - 2)] or [padded]
+
+
+class TrigramIndex:
+    """项目文件的三元组倒排索引，每次运行只构建一次"""
+
+    def __init__(self, project_root: Path):
+        self.project_root = project_root.resolve()
+        self.paths: List[Tuple[str, ...]] = []
+        self.names: List[str] = []
+        self.entry_weights: List[float] = []
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.idf: Dict[str, float] = {}
+        self._build()
+
+    def _build(self):
+        entry_grams = []
+        for root, dirs, files in get_matcher(self.project_root).walk(self.project_root):
+            rel_parts = Path(root).relative_to(self.project_root).parts
+            for file in files:
+                entry_id = len(self.paths)
+                self.paths.append(rel_parts + (file,))
+                self.names.append(file)
+                grams = set(trigrams(file))
+                entry_grams.append(grams)
+                for gram in grams:
+                    self.postings[gram].append(entry_id)
+
+        # 常见片段（如 _audio.mp3）的权重低，稀有片段的权重高
+        total = len(self.paths)
+        self.idf = {gram: math.log(1 + total / len(ids)) for gram, ids in self.postings.items()}
+        self.entry_weights = [sum(self.idf[g] for g in grams) for grams in entry_grams]
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+    def query(self, link: str, near_dir: Optional[Path] = None, limit: int = 3,
+              min_score: float = 0.5) -> List[Tuple[float, Path]]:
+        """返回[(得分, 绝对路径), ...]，得分在0到1之间，从高到低排序"""
+        name = Path(link).name
+        if not name:
+            return []
+        query_grams = set(trigrams(name))
+
+        # 查询中未出现在索引里的片段按最稀有的权重计算
+        unseen_idf = math.log(1 + len(self.paths))
+        query_weight = sum(self.idf.get(g, unseen_idf) for g in query_grams)
+
+        overlaps = defaultdict(float)
+        for gram in query_grams:
+            weight = self.idf.get(gram)
+            if weight is None:
+                continue
+            for entry_id in self.postings[gram]:
+                overlaps[entry_id] += weight
+
+        near_parts = ()
+        if near_dir is not None:
+            try:
+                near_parts = near_dir.resolve().relative_to(self.project_root).parts
+            except ValueError:
+                near_parts = ()
+
+        suffix = Path(name).suffix.lower()
+        results = []
+        for entry_id, overlap in overlaps.items():
+            # 按IDF加权的Dice系数: 2|A∩B| / (|A| + |B|)
+            similarity = 2 * overlap / (query_weight + self.entry_weights[entry_id])
+            if similarity * NAME_WEIGHT + PROXIMITY_WEIGHT < min_score:
+                continue
+            parts = self.paths[entry_id]
+            dir_parts = parts[:-1]
+            common = 0
+            for a, b in zip(dir_parts, near_parts):
+                if a != b:
+                    break
+                common += 1
+            depth = max(len(dir_parts), len(near_parts))
+            proximity = common / depth if depth else 1.0
+            score = similarity * NAME_WEIGHT + proximity * PROXIMITY_WEIGHT
+            if Path(self.names[entry_id]).suffix.lower() != suffix:
+                score -= SUFFIX_PENALTY
+            if score >= min_score:
+                results.append((score, parts))
+
+        results.sort(key=lambda item: (-item[0], len(item[1]), item[1]))
+        return [(round(score, 3), self.project_root.joinpath(*parts)) for score, parts in results[:limit]]
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+诗词页面解析工具
+从docs目录下的诗词Markdown页面中提取标题、作者、朝代和各个章节
+"""
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 文档分类目录（与 .vitepress/config.js 中的侧边栏一致）
+CATEGORIES = ['frontier', 'history', 'landscape', 'lyrical']
+
+# **作者**：杜甫 ｜ **朝代**：唐代
+AUTHOR_PATTERN = re.compile(r'\*\*作者\*\*[：:]\s*([^｜|\n]+?)\s*(?:[｜|]\s*\*\*朝代\*\*[：:]\s*(.+?))?\s*$', re.MULTILINE)
+TITLE_PATTERN = re.compile(r'^#\s+(.+?)\s*$', re.MULTILINE)
+SECTION_PATTERN = re.compile(r'^##\s+(.+?)\s*$', re.MULTILINE)
+FENCE_PATTERN = re.compile(r'^```[^\n]*\n(.*?)^```', re.MULTILINE | re.DOTALL)
+
+
+class PoemPage:
+    """单个诗词页面的解析结果"""
+
+    def __init__(self, path: Path, category: str, title: str, author: str,
+                 dynasty: str, sections: Dict[str, str]):
+        self.path = path
+        self.category = category
+        self.title = title
+        self.author = author
+        self.dynasty = dynasty
+        self.sections = sections
+
+    @property
+    def original_text(self) -> str:
+        """原文（去掉代码块围栏）"""
+        body = self.sections.get('原文', '')
+        match = FENCE_PATTERN.search(body)
+        return (match.group(1) if match else body).strip()
+
+    @property
+    def route(self) -> str:
+        """VitePress路由（cleanUrls模式，不带.md后缀）"""
+        return f"/{self.category}/{self.path.stem}"
+
+
+def section_name(heading: str) -> str:
+    """去掉章节标题前的图标，如 '📜 原文' -> '原文'"""
+    return heading.split()[-1] if heading.split() else heading
+
+
+def parse_poem_page(path: Path, category: Optional[str] = None) -> Optional[PoemPage]:
+    """解析诗词页面，非诗词页面（如index.md）返回None"""
+    content = path.read_text(encoding='utf-8')
+
+    author_match = AUTHOR_PATTERN.search(content)
+    if not author_match:
+        return None
+
+    title_match = TITLE_PATTERN.search(content)
+    title = title_match.group(1) if title_match else path.stem
+
+    sections = {}
+    headings = list(SECTION_PATTERN.finditer(content))
+    for i, heading in enumerate(headings):
+        end = headings[i + 1].start() if i + 1 < len(headings) else len(content)
+        sections[section_name(heading.group(1))] = content[heading.end():end].strip()
+
+    return PoemPage(
+        path=path,
+        category=category or path.parent.name,
+        title=title,
+        author=author_match.group(1).strip(),
+        dynasty=(author_match.group(2) or '').strip(),
+        sections=sections,
+    )
+
+
+def find_poem_pages(docs_dir: Path) -> List[PoemPage]:
+    """查找docs目录下各分类中的所有诗词页面"""
+    pages = []
+    for category in CATEGORIES:
+        category_dir = docs_dir / category
+        if not category_dir.is_dir():
+            continue
+        for root, dirs, files in os.walk(category_dir):
+            dirs[:] = [d for d in dirs if not d.startswith('.') and d != 'data']
+            for file in sorted(files):
+                if not file.endswith('.md') or file == 'index.md':
+                    continue
+                page = parse_poem_page(Path(root) / file, category)
+                if page:
+                    pages.append(page)
+    return pages
@@ -0,0 +1,187 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+批量文件改写引擎
+链接修复先收集为基于偏移的补丁，整批运行结束后再统一落盘:
+每个文件先写入同目录下的临时文件并逐个刷盘，全部处理完后再逐个 os.replace 原子替换，
+中途中断不会留下写了一半的页面；同时可输出统一diff或补丁文件供审阅
+"""
+
+import os
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# (起始偏移, 结束偏移, 替换文本)
+Patch = Tuple[int, int, str]
+
+
+def apply_patches(content: str, patches: Iterable[Patch]) -> str:
+    """按偏移应用补丁，补丁之间不允许重叠"""
+    result = []
+    position = 0
+    for start, end, replacement in sorted(patches):
+        if start < position:
+            raise ValueError(f"补丁区间重叠: {start}-{end}")
+        result.append(content[position:start])
+        result.append(replacement)
+        position = end
+    result.append(content[position:])
+    return ''.join(result)
+
+
+def unified_diff(original: str, modified: str, rel_path: str) -> str:
+    """生成单个文件的统一diff（a/ b/ 前缀，可直接用 git apply 或 patch -p1 应用）"""
+    import difflib
+    lines = difflib.unified_diff(original.splitlines(keepends=True), modified.splitlines(keepends=True),
+                                 fromfile=f'a/{rel_path}', tofile=f'b/{rel_path}')
+    diff = []
+    for line in lines:
+        diff.append(line)
+        if not line.endswith('\n'):
+            diff.append('\n\\ No newline at end of file\n')
+    return ''.join(diff)
+
+
+def fsync_directory(directory: Path):
+    """刷新目录项，保证替换后的文件名也已落盘（Windows不支持，直接跳过）"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class RewriteSession:
+    """一次批量运行中的所有文件改写"""
+
+    def __init__(self, root: Path, dry_run: bool = False, collect_diff: bool = False):
+        self.root = Path(os.path.abspath(root))
+        self.dry_run = dry_run
+        self.collect_diff = collect_diff
+        self.diffs: List[str] = []
+        # 读取时的 (大小, 修改时间)，提交前据此判断文件是否被其他程序改动过
+        self.signatures: Dict[Path, Tuple[int, int]] = {}
+        # 目标文件 -> (临时文件, 读取时的签名, 调用方给出的路径)
+        self.pending: Dict[Path, Tuple[str, Tuple[int, int], Path]] = {}
+        self.updated: List[Path] = []
+        self.skipped: List[Path] = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.commit()
+        else:
+            self.discard()
+        return False
+
+    def relative(self, path: Path) -> str:
+        try:
+            return Path(os.path.abspath(path)).relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(path).as_posix()
+
+    def read(self, path: Path) -> str:
+        """读取文件内容，并记录读取时的签名"""
+        st = os.stat(path)
+        content = Path(path).read_text(encoding='utf-8')
+        self.signatures[Path(os.path.abspath(path))] = (st.st_size, st.st_mtime_ns)
+        return content
+
+    def stage(self, path: Path, original: str, modified: str):
+        """暂存一个文件的新内容（original 应通过 read() 读取）；dry-run 时只记录diff"""
+        if modified == original:
+            return
+        display = path
+        path = Path(os.path.abspath(path))
+        if self.collect_diff:
+            self.diffs.append(unified_diff(original, modified, self.relative(path)))
+        if self.dry_run:
+            return
+
+        import shutil
+        import tempfile
+
+        signature = self.signatures.get(path)
+        if signature is None:
+            st = path.stat()
+            signature = (st.st_size, st.st_mtime_ns)
+        previous = self.pending.pop(path, None)
+        if previous:
+            os.unlink(previous[0])
+        fd, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.', suffix='.tmp')
+        try:
+            # 与读取时的通用换行模式对应，按平台换行符写回
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(modified)
+                f.flush()
+                os.fsync(f.fileno())
+            shutil.copymode(path, temp_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        self.pending[path] = (temp_path, signature, display)
+
+    def commit(self) -> int:
+        """原子替换所有暂存的文件（临时文件在暂存时已刷盘），返回写入的文件数"""
+        if not self.pending:
+            return 0
+        try:
+            directories = set()
+            for path, (temp_path, signature, display) in list(self.pending.items()):
+                # 读取之后文件又被其他程序修改过时不覆盖
+                try:
+                    st = path.stat()
+                    current = (st.st_size, st.st_mtime_ns)
+                except FileNotFoundError:
+                    current = None
+                if current != signature:
+                    os.unlink(temp_path)
+                    self.skipped.append(display)
+                    print(f"警告: {self.relative(path)} 在处理期间被修改，跳过写入")
+                else:
+                    os.replace(temp_path, path)
+                    directories.add(path.parent)
+                    self.updated.append(display)
+                del self.pending[path]
+            for directory in directories:
+                fsync_directory(directory)
+        finally:
+            self.discard()
+        return len(self.updated)
+
+    def discard(self):
+        """丢弃尚未替换的临时文件"""
+        for temp_path, _, _ in self.pending.values():
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+        self.pending.clear()
+
+    def write_diff(self, destination: Optional[str]):
+        """输出合并后的统一diff，destination 为 '-' 时写到标准输出"""
+        patch = ''.join(self.diffs)
+        if destination in (None, '-'):
+            sys.stdout.write(patch)
+            sys.stdout.flush()
+            return
+        with open(destination, 'w', encoding='utf-8', newline='') as f:
+            f.write(patch)
+
+
+def add_diff_arguments(parser):
+    """为修复脚本添加diff输出参数"""
+    parser.add_argument('--diff', action='store_true', help='输出所有修改的统一diff（可与--dry-run一起预览）')
+    parser.add_argument('--patch-file', help='将所有修改的统一diff写入该文件，可用 git apply 应用')
+
+
+def diff_destination(args) -> Optional[str]:
+    return args.patch_file or ('-' if args.diff else None)
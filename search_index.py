@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+离线全文搜索索引构建工具
+将诗词标题、作者和原文切分为汉字二元组（bigram），生成按分类和词项前缀分片的倒排索引，
+浏览器端只需按查询词项加载对应分片
+
+分片规则（前端查询时需保持一致）:
+    分片文件 = <分类>/<桶号>.json，桶号 = '%02x' % (ord(词项首字) % 桶数)
+    倒排列表 = [文档号差值, 权重, 文档号差值, 权重, ...]（文档号在分类内从0开始编号）
+
+使用方式:
+    站点默认仍使用 VitePress 内置的 provider: 'local' 搜索，本索引是供自定义搜索组件
+    或外部页面使用的离线数据，需在构建前生成:
+        python search_index.py && npm run docs:build
+    输出目录 docs/public/search-index 会原样发布到 /search-index/。查询端:
+    1. 读取 /search-index/manifest.json，得到 buckets 和各分类的 docs 列表
+       （[路由, 标题, 作者, 朝代]，下标即文档号）及已生成的分片桶号；
+    2. 用与 tokenize() 相同的规则切分查询词，按 shard_key() 算出桶号，
+       只加载 manifest 中存在的 /search-index/<分类>/<桶号>.json；
+    3. 还原差值编码的倒排列表，按文档号累加各词项的权重后排序。
+"""
+
+import re
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from poem_page import PoemPage, find_poem_pages
+
+INDEX_VERSION = 1
+TOKENIZER = 'cjk-bigram'
+DEFAULT_BUCKETS = 64
+
+# 各字段的权重：标题 > 作者 > 原文
+FIELD_WEIGHTS = {
+    'title': 3,
+    'author': 2,
+    'body': 1,
+}
+
+# 连续的汉字或字母数字片段，标点和空白作为分隔
+TOKEN_RUN_PATTERN = re.compile(r'[㐀-䶿一-鿿豈-﫿]+|[0-9A-Za-z]+')
+
+
+def tokenize(text: str) -> List[str]:
+    """将文本切分为二元组，单字片段保留为一元词项"""
+    terms = []
+    for run in TOKEN_RUN_PATTERN.findall(text):
+        run = run.lower()
+        if len(run) == 1:
+            terms.append(run)
+        else:
+            terms.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return terms
+
+
+def shard_key(term: str, buckets: int) -> str:
+    """词项所在的分片桶号"""
+    return '%02x' % (ord(term[0]) % buckets)
+
+
+def index_page(page: PoemPage) -> Dict[str, int]:
+    """计算单个页面中每个词项的加权词频"""
+    weights = defaultdict(int)
+    fields = {
+        'title': page.title,
+        'author': page.author,
+        'body': page.original_text,
+    }
+    for field, text in fields.items():
+        for term in tokenize(text):
+            weights[term] += FIELD_WEIGHTS[field]
+    return weights
+
+
+def encode_postings(postings: List[List[int]]) -> List[int]:
+    """将[文档号, 权重]列表编码为差值压缩的扁平数组"""
+    encoded = []
+    previous = 0
+    for doc_id, weight in sorted(postings):
+        encoded.extend((doc_id - previous, weight))
+        previous = doc_id
+    return encoded
+
+
+def load_previous_manifest(output_dir: Path) -> Optional[dict]:
+    """读取输出目录中上次生成的清单；目录中的 manifest.json 不是本工具生成的时报错，避免覆盖或误删"""
+    manifest_file = output_dir / 'manifest.json'
+    if not manifest_file.exists():
+        return None
+    try:
+        manifest = json.loads(manifest_file.read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        manifest = None
+    if (not isinstance(manifest, dict) or manifest.get('version') != INDEX_VERSION
+            or manifest.get('tokenizer') != TOKENIZER or not isinstance(manifest.get('categories'), dict)):
+        raise ValueError(f"{manifest_file} 不是搜索索引的清单，请指定专用的输出目录")
+    return manifest
+
+
+def remove_previous_shards(output_dir: Path, manifest: dict):
+    """只删除上次清单中列出的分片，避免残留已删除的分类或桶"""
+    for category_name, category in manifest['categories'].items():
+        category_dir = output_dir / category_name
+        for key in category.get('shards', {}):
+            shard_file = category_dir / f"{key}.json"
+            if shard_file.is_file():
+                shard_file.unlink()
+        if category_dir.is_dir() and not any(category_dir.iterdir()):
+            category_dir.rmdir()
+
+
+def build_index(docs_dir: Path, output_dir: Path, buckets: int = DEFAULT_BUCKETS) -> dict:
+    """构建分片索引并写入输出目录，返回构建统计"""
+    start = time.perf_counter()
+    previous = load_previous_manifest(output_dir)
+    pages = find_poem_pages(docs_dir)
+
+    manifest = {
+        'version': INDEX_VERSION,
+        'tokenizer': TOKENIZER,
+        'buckets': buckets,
+        'categories': {},
+    }
+    # shards[分类][桶号][词项] = [[文档号, 权重], ...]
+    shards = defaultdict(lambda: defaultdict(lambda: defaultdict(list)))
+
+    for page in pages:
+        category = manifest['categories'].setdefault(page.category, {'docs': [], 'shards': {}})
+        doc_id = len(category['docs'])
+        category['docs'].append([page.route, page.title, page.author, page.dynasty])
+        for term, weight in index_page(page).items():
+            shards[page.category][shard_key(term, buckets)][term].append([doc_id, weight])
+
+    # 清理旧索引，避免残留已删除的分片
+    if previous is not None:
+        remove_previous_shards(output_dir, previous)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    total_terms = 0
+    shard_sizes = []
+    for category_name, category_shards in shards.items():
+        category_dir = output_dir / category_name
+        category_dir.mkdir(parents=True, exist_ok=True)
+        for key, terms in sorted(category_shards.items()):
+            data = {term: encode_postings(postings) for term, postings in sorted(terms.items())}
+            payload = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            (category_dir / f"{key}.json").write_bytes(payload)
+            manifest['categories'][category_name]['shards'][key] = len(payload)
+            shard_sizes.append(len(payload))
+            total_terms += len(terms)
+
+    manifest_payload = json.dumps(manifest, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    (output_dir / 'manifest.json').write_bytes(manifest_payload)
+
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'docs': len(pages),
+        'terms': total_terms,
+        'shards': len(shard_sizes),
+        'manifest_bytes': len(manifest_payload),
+        'total_bytes': sum(shard_sizes) + len(manifest_payload),
+        'max_shard_bytes': max(shard_sizes) if shard_sizes else 0,
+        'avg_shard_bytes': int(sum(shard_sizes) / len(shard_sizes)) if shard_sizes else 0,
+        'build_ms': round((time.perf_counter() - start) * 1000, 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='构建离线全文搜索分片索引')
+    parser.add_argument('--docs', default='docs', help='文档目录 (默认: docs)')
+    parser.add_argument('--output', default='docs/public/search-index', help='索引输出目录')
+    parser.add_argument('--buckets', type=int, default=DEFAULT_BUCKETS, help=f'每个分类的前缀分片数 (默认: {DEFAULT_BUCKETS})')
+    parser.add_argument('--bench-log', help='将本次构建耗时和分片大小追加到JSON Lines基准记录文件')
+
+    args = parser.parse_args()
+
+    docs_dir = Path(args.docs)
+    if not docs_dir.exists():
+        print(f"错误: 文档目录不存在 {docs_dir}")
+        return 1
+
+    try:
+        stats = build_index(docs_dir, Path(args.output), args.buckets)
+    except ValueError as e:
+        print(f"错误: {e}")
+        return 1
+
+    print(f"=== 搜索索引构建统计 ===")
+    print(f"文档数: {stats['docs']}")
+    print(f"词项数: {stats['terms']}")
+    print(f"分片数: {stats['shards']}")
+    print(f"索引总大小: {stats['total_bytes'] / 1024:.1f} KB")
+    print(f"最大分片: {stats['max_shard_bytes'] / 1024:.1f} KB")
+    print(f"平均分片: {stats['avg_shard_bytes'] / 1024:.1f} KB")
+    print(f"构建耗时: {stats['build_ms']} ms")
+    print(f"输出目录: {args.output}")
+
+    if args.bench_log:
+        bench_log = Path(args.bench_log)
+        bench_log.parent.mkdir(parents=True, exist_ok=True)
+        with open(bench_log, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(stats, ensure_ascii=False) + '\n')
+        print(f"基准记录已追加: {bench_log}")
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
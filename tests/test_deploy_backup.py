@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部署备份工具测试
+只使用本地临时目录，覆盖快照去重、恢复/回滚和过期清理
+"""
+
+import os
+import sys
+import json
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deploy_backup import BackupStore, RESTORE_MARKER  # noqa: E402
+
+RELEASE_1 = {
+    'index.html': '<html><body>首页</body></html>',
+    'frontier/关山月-李白.html': '<html><body>明月出天山</body></html>',
+    'assets/app.js': 'console.log("v1");\n' * 50,
+    'data/audio.mp3': 'ID3' + 'x' * 2048,
+}
+
+# 第二次发布: 修改一个页面、新增一个页面，其余文件不变
+RELEASE_2 = dict(RELEASE_1, **{
+    'index.html': '<html><body>首页 v2</body></html>',
+    'history/登高-杜甫.html': '<html><body>风急天高猿啸哀</body></html>',
+})
+
+
+def write_site(root: Path, files: dict):
+    if root.exists():
+        shutil.rmtree(root)
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+def read_site(root: Path) -> dict:
+    files = {}
+    for path in root.rglob('*'):
+        if path.is_file() and path.name != RESTORE_MARKER:
+            files[path.relative_to(root).as_posix()] = path.read_text(encoding='utf-8')
+    return files
+
+
+class DeployBackupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.store = BackupStore(self.temp_dir / 'store', workers=2)
+        self.dist = self.temp_dir / 'dist'
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def snapshot(self, files: dict, release: str) -> dict:
+        write_site(self.dist, files)
+        return self.store.snapshot(self.dist, release=release)
+
+    def age_release(self, release: str, days: int):
+        manifest_path = self.store.manifests_dir / f"{release}.json"
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+        manifest['created'] = (datetime.now() - timedelta(days=days)).isoformat(timespec='seconds')
+        manifest_path.write_text(json.dumps(manifest), encoding='utf-8')
+
+    def test_snapshot_deduplicates_unchanged_files(self):
+        first = self.snapshot(RELEASE_1, 'r1')
+        second = self.snapshot(RELEASE_2, 'r2')
+        self.assertEqual(first['stats']['new_objects'], len(RELEASE_1))
+        # 只有修改和新增的两个文件产生新对象
+        self.assertEqual(second['stats']['new_objects'], 2)
+        objects = [p for p in self.store.objects_dir.rglob('*') if p.is_file()]
+        self.assertEqual(len(objects), len(RELEASE_1) + 2)
+
+    def test_restore_and_rollback_keep_unrelated_files(self):
+        self.snapshot(RELEASE_1, 'r1')
+        self.snapshot(RELEASE_2, 'r2')
+        live = self.temp_dir / 'live'
+        live.mkdir()
+        (live / 'keep.txt').write_text('不属于任何发布', encoding='utf-8')
+
+        self.store.restore('r2', live)
+        self.assertEqual(read_site(live), dict(RELEASE_2, **{'keep.txt': '不属于任何发布'}))
+
+        # 回滚: 删除 r2 新增的页面，恢复修改过的页面，不动其他文件
+        stats = self.store.restore('r1', live)
+        self.assertEqual(stats['removed'], 1)
+        self.assertEqual(read_site(live), dict(RELEASE_1, **{'keep.txt': '不属于任何发布'}))
+        self.assertFalse((live / 'history').exists())
+
+    def test_delete_refuses_unmanaged_directory(self):
+        self.snapshot(RELEASE_1, 'r1')
+        checkout = self.temp_dir / 'checkout'
+        (checkout / '.git').mkdir(parents=True)
+        with self.assertRaises(ValueError):
+            self.store.restore('r1', checkout, delete=True)
+        self.assertTrue((checkout / '.git').is_dir())
+
+        # 由 restore 创建的目录可以完整镜像
+        mirror = self.temp_dir / 'mirror'
+        self.store.restore('r1', mirror)
+        (mirror / 'stray.html').write_text('x', encoding='utf-8')
+        self.store.restore('r1', mirror, delete=True)
+        self.assertEqual(read_site(mirror), RELEASE_1)
+
+    def test_gc_expires_old_releases_and_unreferenced_objects(self):
+        self.snapshot(RELEASE_1, 'r1')
+        self.snapshot(RELEASE_2, 'r2')
+        self.age_release('r1', 30)
+        self.age_release('r2', 20)
+
+        # 最新的发布即使过期也保留
+        stats = self.store.gc(retention_days=7, keep=1)
+        self.assertEqual(stats['expired_releases'], ['r1'])
+        # 只有 r1 独有的旧首页对象被回收
+        self.assertEqual(stats['removed_objects'], 1)
+
+        restored = self.temp_dir / 'restored'
+        self.store.restore('r2', restored)
+        self.assertEqual(read_site(restored), RELEASE_2)
+
+
+if __name__ == '__main__':
+    unittest.main()
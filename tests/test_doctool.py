@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+doctool 启动路径测试
+在干净的子进程中加载子命令，检查不应出现的模块和 check 的启动耗时预算
+"""
+
+import os
+import sys
+import json
+import subprocess
+import unittest
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, PROJECT_ROOT)
+
+import doctool  # noqa: E402
+
+# check 的启动预算（从导入 doctool 起的全部导入耗时），显式写在测试里
+CHECK_STARTUP_BUDGET_MS = 50.0
+
+
+def loaded_modules(code: str) -> set:
+    """在子进程中执行code，返回执行后 sys.modules 中的模块名"""
+    script = f"import sys, json; {code}; print(json.dumps(sorted(sys.modules)))"
+    result = subprocess.run([sys.executable, '-c', script], cwd=PROJECT_ROOT,
+                            capture_output=True, text=True, check=True)
+    return set(json.loads(result.stdout.splitlines()[-1]))
+
+
+class StartupPathTest(unittest.TestCase):
+
+    def test_check_does_not_load_heavy_modules(self):
+        import_code = "import doctool; doctool.build_parser('check'); doctool.load_command('check')"
+        modules = loaded_modules(import_code)
+        self.assertEqual([name for name in doctool.HEAVY_MODULES if name in modules], [])
+
+    def test_parser_for_other_commands_skips_link_batch(self):
+        for command in ('move', 'assets', 'startup-check'):
+            with self.subTest(command=command):
+                modules = loaded_modules(f"import doctool; doctool.build_parser({command!r})")
+                self.assertNotIn('link_batch', modules)
+                self.assertNotIn('link_validator', modules)
+
+    def test_check_import_time_within_budget(self):
+        # 先编译 .pyc，再取多次测量的最小值，避免首次编译和机器抖动
+        doctool.warm_bytecode()
+        total_ms = min(doctool.measure_import_time('check')[0] for _ in range(3))
+        self.assertLessEqual(total_ms, CHECK_STARTUP_BUDGET_MS)
+
+
+if __name__ == '__main__':
+    unittest.main()
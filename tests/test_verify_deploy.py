@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部署验证工具测试
+在临时端口上启动本地替身服务，验证 cleanUrls 路由可以通过、缺失页面会被报告
+"""
+
+import io
+import os
+import sys
+import shutil
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+from contextlib import redirect_stdout
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from verify_deploy import make_server, run_verification  # noqa: E402
+
+SITE_FILES = {
+    'index.html': '<html><body>首页</body></html>',
+    '404.html': '<html><body>未找到</body></html>',
+    'frontier/index.html': '<html><body>边塞诗</body></html>',
+    'frontier/关山月-李白.html': '<html><body>' + '明月出天山，苍茫云海间。' * 200 + '</body></html>',
+    'assets/app.js': 'console.log("app");\n' * 100,
+}
+
+
+def write_site(root: Path, files: dict):
+    for rel_path, content in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(content, encoding='utf-8')
+
+
+class VerifyDeployTest(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = Path(tempfile.mkdtemp())
+        self.served = self.temp_dir / 'served'
+        write_site(self.served, SITE_FILES)
+        self.server = make_server(self.served, 0)
+        self.base_url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+        shutil.rmtree(self.temp_dir)
+
+    def verify(self, dist_dir: Path) -> bool:
+        with redirect_stdout(io.StringIO()):
+            return run_verification(self.base_url, dist_dir, timeout=5, concurrency=4)
+
+    def test_clean_url_routes_pass(self):
+        self.assertTrue(self.verify(self.served))
+
+    def test_missing_page_fails(self):
+        # 本地构建中有、线上（替身服务）缺失的页面
+        dist_dir = self.temp_dir / 'dist'
+        write_site(dist_dir, dict(SITE_FILES, **{'frontier/凉州词-王翰.html': '<html><body>葡萄美酒</body></html>'}))
+        self.assertFalse(self.verify(dist_dir))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+部署后冒烟与延迟验证工具
+根据本地构建产物枚举所有页面路由和静态资源，通过复用连接并发请求已部署站点（VERIFY_URL），
+检查状态码、内容哈希和压缩，并统计 p50/p95/p99 延迟
+
+本地验证: python verify_deploy.py --serve docs/.vitepress/dist --port 8080
+          python verify_deploy.py --url http://127.0.0.1:8080
+"""
+
+import os
+import sys
+import gzip
+import zlib
+import math
+import time
+import hashlib
+import argparse
+import threading
+import http.client
+import http.server
+from io import BytesIO
+from pathlib import Path
+from functools import partial
+from urllib.parse import quote, urljoin, urlsplit
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+
+from check_dist_links import find_dist_dir, list_dist_files
+
+DEFAULT_TIMEOUT = 30
+DEFAULT_CONCURRENCY = 16
+MAX_REDIRECTS = 3
+
+# 需要启用压缩的文本类资源
+COMPRESSIBLE_SUFFIXES = {'.html', '.js', '.mjs', '.css', '.json', '.svg', '.xml', '.txt', '.map'}
+# 小于该大小的资源不要求压缩（与nginx gzip_min_length的常见配置一致）
+COMPRESS_MIN_BYTES = 1024
+
+
+class Target:
+    """一个待验证的URL及其本地期望内容"""
+
+    def __init__(self, url_path: str, local_file: Path):
+        self.url_path = url_path
+        self.local_file = local_file
+        self.expected_size = local_file.stat().st_size
+        self._expected_hash = None
+
+    @property
+    def expected_hash(self) -> str:
+        if self._expected_hash is None:
+            self._expected_hash = hashlib.sha256(self.local_file.read_bytes()).hexdigest()
+        return self._expected_hash
+
+    @property
+    def compressible(self) -> bool:
+        return self.local_file.suffix.lower() in COMPRESSIBLE_SUFFIXES and self.expected_size >= COMPRESS_MIN_BYTES
+
+
+class Result:
+    """单个URL的验证结果"""
+
+    def __init__(self, target: Target, status: int = 0, latency_ms: float = 0.0,
+                 hash_ok: bool = False, encoding: str = '', error: str = ''):
+        self.target = target
+        self.status = status
+        self.latency_ms = latency_ms
+        self.hash_ok = hash_ok
+        self.encoding = encoding
+        self.error = error
+
+    @property
+    def ok(self) -> bool:
+        return self.status == 200 and self.hash_ok and not self.error
+
+
+def enumerate_targets(dist_dir: Path, clean_urls: bool = True) -> List[Target]:
+    """根据本地构建产物生成所有需要验证的URL"""
+    targets = []
+    for rel_path in sorted(list_dist_files(dist_dir)):
+        url_path = '/' + rel_path
+        if rel_path.endswith('.html'):
+            if rel_path == 'index.html' or rel_path.endswith('/index.html'):
+                url_path = url_path[:-len('index.html')]
+            elif clean_urls and rel_path != '404.html':
+                url_path = url_path[:-len('.html')]
+        targets.append(Target(url_path, dist_dir / rel_path))
+    return targets
+
+
+class ConnectionPool:
+    """每个线程持有一个到目标站点的长连接"""
+
+    def __init__(self, base_url: str, timeout: float):
+        parts = urlsplit(base_url)
+        self.scheme = parts.scheme or 'http'
+        self.host = parts.hostname
+        self.port = parts.port
+        self.prefix = parts.path.rstrip('/')
+        self.timeout = timeout
+        self._local = threading.local()
+        self._connections = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> http.client.HTTPConnection:
+        connection_class = http.client.HTTPSConnection if self.scheme == 'https' else http.client.HTTPConnection
+        connection = connection_class(self.host, self.port, timeout=self.timeout)
+        with self._lock:
+            self._connections.append(connection)
+        return connection
+
+    def close(self):
+        """关闭所有线程打开过的连接"""
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+
+    def request(self, path: str) -> Tuple[int, Dict[str, str], bytes]:
+        """发送GET请求，连接被服务端关闭时重连一次"""
+        for attempt in range(2):
+            connection = getattr(self._local, 'connection', None)
+            if connection is None:
+                connection = self._connect()
+                self._local.connection = connection
+            try:
+                connection.request('GET', self.prefix + path, headers={
+                    'Accept-Encoding': 'gzip, deflate',
+                    'User-Agent': 'verify-deploy/1.0',
+                })
+                response = connection.getresponse()
+                body = response.read()
+                headers = {k.lower(): v for k, v in response.getheaders()}
+                if response.will_close:
+                    connection.close()
+                    self._local.connection = None
+                return response.status, headers, body
+            except (http.client.HTTPException, ConnectionError, OSError):
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    raise
+        raise ConnectionError('unreachable')
+
+
+def decode_body(body: bytes, encoding: str) -> bytes:
+    """按Content-Encoding解压响应体"""
+    if encoding == 'gzip':
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+def verify_target(pool: ConnectionPool, target: Target) -> Result:
+    """请求单个URL并与本地文件比对"""
+    path = quote(target.url_path, safe="/:@!$&'()*+,;=-._~")
+    start = time.perf_counter()
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            status, headers, body = pool.request(path)
+            if status in (301, 302, 307, 308) and 'location' in headers:
+                location = urlsplit(urljoin(path, headers['location']))
+                if location.netloc and location.hostname != pool.host:
+                    break
+                path = location.path
+                continue
+            break
+        latency_ms = (time.perf_counter() - start) * 1000
+        encoding = headers.get('content-encoding', '').strip().lower()
+        if status != 200:
+            return Result(target, status, latency_ms, encoding=encoding)
+        content = decode_body(body, encoding)
+        hash_ok = hashlib.sha256(content).hexdigest() == target.expected_hash
+        return Result(target, status, latency_ms, hash_ok, encoding)
+    except Exception as e:
+        return Result(target, latency_ms=(time.perf_counter() - start) * 1000, error=str(e) or type(e).__name__)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """最近秩法计算百分位数"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_verification(base_url: str, dist_dir: Path, timeout: float = DEFAULT_TIMEOUT,
+                     concurrency: int = DEFAULT_CONCURRENCY, expect_gzip: bool = True,
+                     max_report: int = 20) -> bool:
+    """验证整个站点，打印报告，全部通过时返回True"""
+    targets = enumerate_targets(dist_dir)
+    print(f"验证地址: {base_url}")
+    print(f"待验证URL: {len(targets)} 个，并发: {concurrency}")
+
+    pool = ConnectionPool(base_url, timeout)
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            results = list(executor.map(partial(verify_target, pool), targets))
+    finally:
+        pool.close()
+    elapsed = time.perf_counter() - start
+
+    failed_status = [r for r in results if r.error or r.status != 200]
+    hash_mismatch = [r for r in results if r.status == 200 and not r.error and not r.hash_ok]
+    uncompressed = [r for r in results if r.ok and r.target.compressible and not r.encoding] if expect_gzip else []
+    latencies = sorted(r.latency_ms for r in results if not r.error)
+
+    print(f"\n=== 部署验证报告 ===")
+    print(f"请求总数: {len(results)}")
+    print(f"状态异常: {len(failed_status)}")
+    print(f"内容不一致: {len(hash_mismatch)}")
+    print(f"未压缩的文本资源: {len(uncompressed)}")
+    print(f"总耗时: {elapsed:.2f} 秒")
+    print(f"延迟 p50: {percentile(latencies, 50):.1f} ms")
+    print(f"延迟 p95: {percentile(latencies, 95):.1f} ms")
+    print(f"延迟 p99: {percentile(latencies, 99):.1f} ms")
+
+    for title, items, describe in [
+        ('状态异常的URL', failed_status, lambda r: r.error or f"HTTP {r.status}"),
+        ('内容与本地构建不一致的URL', hash_mismatch, lambda r: f"本地 {r.target.expected_size} 字节"),
+        ('未启用压缩的URL', uncompressed, lambda r: f"{r.target.expected_size} 字节"),
+    ]:
+        if not items:
+            continue
+        print(f"\n{title}:")
+        for r in items[:max_report]:
+            print(f"  {r.target.url_path}: {describe(r)}")
+        if len(items) > max_report:
+            print(f"  ... 另有 {len(items) - max_report} 个未列出")
+
+    success = not failed_status and not hash_mismatch
+    print("\n✅ 部署验证通过!" if success else "\n❌ 部署验证失败")
+    return success
+
+
+class CleanUrlsHandler(http.server.SimpleHTTPRequestHandler):
+    """模拟线上nginx的本地服务：支持长连接、cleanUrls和gzip，用于本地验证"""
+
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    gzip_enabled = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def translate_path(self, path):
+        local_path = super().translate_path(path)
+        if not os.path.exists(local_path) and os.path.exists(local_path + '.html'):
+            return local_path + '.html'
+        return local_path
+
+    def send_head(self):
+        local_path = self.translate_path(self.path)
+        if os.path.isdir(local_path) and not self.path.split('?', 1)[0].endswith('/'):
+            return super().send_head()
+        if os.path.isdir(local_path):
+            local_path = os.path.join(local_path, 'index.html')
+        if not os.path.isfile(local_path):
+            self.send_error(404, 'File not found')
+            return None
+
+        with open(local_path, 'rb') as f:
+            body = f.read()
+        encoding = ''
+        suffix = os.path.splitext(local_path)[1].lower()
+        if (self.gzip_enabled and suffix in COMPRESSIBLE_SUFFIXES and len(body) >= COMPRESS_MIN_BYTES
+                and 'gzip' in self.headers.get('Accept-Encoding', '')):
+            body = gzip.compress(body)
+            encoding = 'gzip'
+
+        self.send_response(200)
+        self.send_header('Content-Type', self.guess_type(local_path))
+        self.send_header('Content-Length', str(len(body)))
+        if encoding:
+            self.send_header('Content-Encoding', encoding)
+        self.end_headers()
+        return BytesIO(body)
+
+
+def make_server(directory: Path, port: int = 0, gzip_enabled: bool = True) -> http.server.ThreadingHTTPServer:
+    """创建本地替身服务（port 为 0 时使用系统分配的空闲端口），由调用方负责运行和关闭"""
+    handler = partial(CleanUrlsHandler, directory=str(directory))
+    CleanUrlsHandler.gzip_enabled = gzip_enabled
+    return http.server.ThreadingHTTPServer(('127.0.0.1', port), handler)
+
+
+def serve(directory: Path, port: int, gzip_enabled: bool = True):
+    """启动本地替身服务"""
+    server = make_server(directory, port, gzip_enabled)
+    print(f"本地服务: http://127.0.0.1:{server.server_address[1]} -> {directory}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='部署后冒烟与延迟验证')
+    parser.add_argument('--url', default=os.getenv('VERIFY_URL'), help='已部署站点地址 (默认: 环境变量VERIFY_URL)')
+    parser.add_argument('--timeout', type=float, default=float(os.getenv('VERIFY_TIMEOUT', DEFAULT_TIMEOUT)),
+                        help='单个请求超时秒数 (默认: 环境变量VERIFY_TIMEOUT或30)')
+    parser.add_argument('--dist', help='本地构建输出目录')
+    parser.add_argument('--concurrency', type=int, default=DEFAULT_CONCURRENCY, help=f'并发连接数 (默认: {DEFAULT_CONCURRENCY})')
+    parser.add_argument('--serve', metavar='DIR', help='不做验证，启动本地替身服务')
+    parser.add_argument('--port', type=int, default=8080, help='本地替身服务端口 (默认: 8080)')
+    parser.add_argument('--no-gzip', action='store_true', help='不要求文本资源启用压缩')
+
+    args = parser.parse_args()
+
+    expect_gzip = not args.no_gzip and os.getenv('ENABLE_GZIP', 'true').lower() == 'true'
+
+    if args.serve:
+        serve(Path(args.serve), args.port, expect_gzip)
+        return 0
+
+    if not args.url:
+        print("错误: 未设置验证地址，请配置环境变量 VERIFY_URL 或使用 --url")
+        return 1
+
+    dist_dir = Path(args.dist) if args.dist else find_dist_dir()
+    if not dist_dir.is_dir():
+        print(f"错误: 构建目录不存在 {dist_dir}")
+        return 1
+
+    success = run_verification(args.url, dist_dir, args.timeout, args.concurrency, expect_gzip)
+    return 0 if success else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())